@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+import os
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+import pandas as pd
+import tensorflow as tf
+import yaml
+
+from lib.benchmark import evaluate_mae, measure_latency
+from lib.data_pipeline import load_features_and_labels, split_dataset
+from lib.model import cnn_for_dos_fused, fuse_branched_model
+
+
+# Main Loop
+if __name__ == "__main__":
+    # Set global random seed
+    tf.random.set_seed(0)
+    np.random.seed(0)
+
+    # Load configs
+    with open("config.yaml") as ymlfile:
+        cfg = yaml.safe_load(ymlfile)
+    ## model training
+    batch_size = cfg["model_training"]["batch_size"]
+    validation_ratio = cfg["model_training"]["validation_ratio"]
+    sample_size = cfg["model_training"]["sample_size"]
+    nedos = cfg["model_training"]["nedos"]
+    ## fused model benchmark
+    benchmark_cfg = cfg["fused_model_benchmark"]
+
+
+    # Load features(DOS) and labels (resampled to nedos)
+    features, labels = load_features_and_labels(cfg, nedos=nedos)
+    input_shape = features.shape[1:]
+
+    # Same split as keras-tuner.py, so the saved model is evaluated on its validation set
+    tf.random.set_seed(0)
+    train_set, val_set = split_dataset(features, labels, validation_ratio, batch_size, sample_size=sample_size)
+
+
+    # Collect models to benchmark
+    models = {}
+
+    ## Saved (branched) model, and its fused form with the same weights
+    if os.path.isdir(benchmark_cfg["saved_model"]):
+        saved_model = tf.keras.models.load_model(benchmark_cfg["saved_model"])
+        models["saved"] = saved_model
+        models["saved_fused"] = fuse_branched_model(saved_model)
+    else:
+        print(f"Saved model {benchmark_cfg['saved_model']} not found, skipped.")
+
+    ## Trained fused variants
+    for variant in benchmark_cfg["variants"]:
+        tf.random.set_seed(0)
+        model = cnn_for_dos_fused(input_shape, drop_out_rate=benchmark_cfg["drop_out_rate"], **variant)
+        model.compile(
+            optimizer=tf.keras.optimizers.legacy.Adam(learning_rate=benchmark_cfg["learning_rate"]),
+            loss=tf.keras.losses.MeanSquaredError(),
+            metrics=[tf.keras.metrics.mean_absolute_error, ],
+        )
+
+        model.fit(train_set, validation_data=val_set,
+                  epochs=benchmark_cfg["epochs"],
+                  verbose=2,
+                  callbacks=[
+                      tf.keras.callbacks.EarlyStopping(monitor="val_mean_absolute_error", patience=benchmark_cfg["patience"], restore_best_weights=True),
+                      tf.keras.callbacks.ReduceLROnPlateau(monitor="val_mean_absolute_error", patience=10, factor=0.5, min_lr=1e-7),
+                  ],
+                  )
+
+        variant_name = f"shared_emb{variant.get('orbital_embedding_dim', 8)}" if variant.get("share_weights", True) else "grouped"
+        models[variant_name] = model
+
+
+    # Benchmark accuracy and throughput
+    results = []
+    for name, model in models.items():
+        result = {
+            "model": name,
+            "params": model.count_params(),
+            "val_mae": evaluate_mae(model, val_set),
+        }
+        for inference_batch_size in benchmark_cfg["batch_sizes"]:
+            latency = measure_latency(model, input_shape, inference_batch_size,
+                                      benchmark_cfg["latency_repeats"],
+                                      jit_compile=benchmark_cfg["jit_compile"])
+            result[f"throughput_bs{inference_batch_size}"] = 1e3 / latency  # samples per second
+
+        results.append(result)
+        print(result)
+
+
+    # Summarize results
+    results = pd.DataFrame(results).set_index("model")
+    print(results.to_string())
+    results.to_csv(benchmark_cfg["results_file"])
@@ -6,6 +6,9 @@ import tensorflow as tf
 
 
 def hp_model(hp, input_shape=(4000, 9, 6)):
+    # Check args
+    assert len(input_shape) == 3
+    numSamplings, numOrbitals, numChannels = input_shape
 
     def branch(branch_input, drop_out_rate, numFilters=16):
         """Each branch of the CNN network.
@@ -14,12 +17,12 @@ def hp_model(hp, input_shape=(4000, 9, 6)):
             branch_input: input of each branch
 
         Notes:
-            expecting (batch_size, 4000, numOrbitals, numChannels) input
+            expecting (batch_size, NEDOS, numOrbitals, numChannels) input
 
         """
 
-        # Reshape (None, 4000, 6) to (None, 4000, 1, 6)
-        conv_x = tf.keras.layers.Reshape(target_shape=(4000, 1, 6))(branch_input)
+        # Reshape (None, NEDOS, numChannels) to (None, NEDOS, 1, numChannels)
+        conv_x = tf.keras.layers.Reshape(target_shape=(numSamplings, 1, numChannels))(branch_input)
 
 
         # Dynamic amount of ConV blocks
@@ -97,20 +100,11 @@ def hp_model(hp, input_shape=(4000, 9, 6)):
     master_input = tf.keras.Input(shape=input_shape, name="master_input")
 
     # Assign input and get output for each branch
-    # branch_shape = input_shape[0]
-    branch_output_0 = branch((master_input[:, :, 0]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_1 = branch((master_input[:, :, 1]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_2 = branch((master_input[:, :, 2]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_3 = branch((master_input[:, :, 3]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_4 = branch((master_input[:, :, 4]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_5 = branch((master_input[:, :, 5]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_6 = branch((master_input[:, :, 6]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_7 = branch((master_input[:, :, 7]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-    branch_output_8 = branch((master_input[:, :, 8]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters)
-
-
-    # Concatenate branch outputs
-    concat_output = tf.keras.layers.Concatenate(axis=-1)([branch_output_0, branch_output_1, branch_output_2, branch_output_3, branch_output_4, branch_output_5, branch_output_6, branch_output_7, branch_output_8])
+    branch_outputs = [branch((master_input[:, :, i]), drop_out_rate=hp_drop_out_rate, numFilters=hp_numFilters) for i in range(numOrbitals)]
+
+
+    # Concatenate branch outputs (Concatenate needs at least two inputs)
+    concat_output = tf.keras.layers.Concatenate(axis=-1)(branch_outputs) if numOrbitals > 1 else branch_outputs[0]
 
 
     # Master output layer
@@ -2,19 +2,17 @@
 # -*- coding: utf-8 -*-
 
 
+import functools
 import keras_tuner
 import numpy as np
 import os
 os.environ["TF_GPU_THREAD_MODE"] = "gpu_private"
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
-from pathlib import Path
-import sys
 import tensorflow as tf
-import warnings
 import yaml
 
 from hp_model import hp_model
-from lib.dataset import Dataset
+from lib.data_pipeline import load_features_and_labels, split_dataset
 
 
 # Main Loop
@@ -30,97 +28,23 @@ if __name__ == "__main__":
     # Load configs
     with open("config.yaml") as ymlfile:
         cfg = yaml.safe_load(ymlfile)
-    ## paths
-    feature_dir = Path(cfg["path"]["feature_dir"])
-    label_dir = Path(cfg["path"]["label_dir"])
-    ## species
-    substrates = cfg["species"]["substrates"]
-    adsorbates = cfg["species"]["adsorbates"]
-    centre_atoms = cfg["species"]["centre_atoms"]
-    append_adsorbate_dos = cfg["species"]["append_adsorbate_dos"]
-    load_augmentation = cfg["species"]["load_augmentation"]
-    augmentations = cfg["species"]["augmentations"]
-    spin = cfg["species"]["spin"]
     ## model training
-    preprocessing = cfg["model_training"]["preprocessing"]
-    remove_ghost = cfg["model_training"]["remove_ghost"]
     batch_size = cfg["model_training"]["batch_size"]
     validation_ratio = cfg["model_training"]["validation_ratio"]
-    epochs = cfg["model_training"]["epochs"]
     sample_size = cfg["model_training"]["sample_size"]
+    nedos = cfg["model_training"]["nedos"]
 
 
-    # Load features(DOS) and labels from cached file to save time
-    if os.path.exists("features.npy") and os.path.exists("labels.npy"):
-        warnings.warn("Warning! features/labels load from cached file. Tags changed after cache generation in config.yaml might not take effect.")
-        features = tf.convert_to_tensor(np.load("features.npy"))
-        labels = tf.convert_to_tensor(np.load("labels.npy"))
+    # Load features(DOS) and labels (resampled to nedos)
+    features, labels = load_features_and_labels(cfg, nedos=nedos)
 
-        total_sample = labels.shape[0]
-
-
-    else:
-        # Initiate dataset loader
-        dataFetcher = Dataset()
-
-        # Load feature
-        dataFetcher.load_feature(feature_dir, substrates, adsorbates, centre_atoms,
-                                states={"is", }, spin=spin,
-                                remove_ghost=remove_ghost,
-                                load_augment=load_augmentation, augmentations=augmentations)
-
-        ## Take subset
-        if sample_size == "ALL":
-            print(f"A total of {dataFetcher.numFeature} samples loaded.")
-        elif isinstance(sample_size, int) and sample_size >= 1:
-            print(f"A total of {dataFetcher.numFeature} samples found, {sample_size} loaded.")
-        else:
-            raise ValueError('sample_size should be "ALL" or an interger.')
-
-        ## Append molecule DOS
-        if append_adsorbate_dos:
-            dataFetcher.append_adsorbate_DOS(adsorbate_dos_dir=os.path.join(feature_dir, "adsorbate-DOS"))
-
-        ## Preprocess feature (DOS)
-        dataFetcher.scale_feature(mode=preprocessing)
-
-
-        # Load label
-        dataFetcher.load_label(label_dir)
-
-        # Combine feature and label
-        features = np.array(list(dataFetcher.feature.values()))
-        labels = np.array(list(dataFetcher.label.values()))
-        np.save("features.npy", features)
-        np.save("labels.npy", labels)
-
-        print("Cache generated. Exiting...")
-        sys.exit()
-
-
-    dataset = tf.data.Dataset.from_tensor_slices((features, labels))
-    dataset = dataset.shuffle(buffer_size=total_sample, reshuffle_each_iteration=False)
-
-    ## Take a subset if required
-    if sample_size != "ALL":
-        dataset = dataset.take(sample_size)
-
-    # Train-validation split
-    train_size = int(total_sample * (1 - validation_ratio))
-    train_set = dataset.take(train_size)
-    val_set = dataset.skip(train_size)
-
-    # Batch and prefetch
-    train_set = train_set.batch(batch_size=batch_size)
-    train_set = train_set.prefetch(tf.data.AUTOTUNE)
-
-    val_set = val_set.batch(batch_size)
-    val_set = val_set.prefetch(tf.data.AUTOTUNE)
+    # Shuffle, split and batch
+    train_set, val_set = split_dataset(features, labels, validation_ratio, batch_size, sample_size=sample_size)
 
 
     # Hyper Tuning with Keras Tuner
     tuner = keras_tuner.Hyperband(
-        hypermodel=hp_model,
+        hypermodel=functools.partial(hp_model, input_shape=features.shape[1:]),
         max_epochs=200,
         factor=3,
         overwrite=False,
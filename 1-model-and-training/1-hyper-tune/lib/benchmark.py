@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+import tensorflow as tf
+import time
+
+
+def measure_latency(model, input_shape, batch_size, repeats, jit_compile=False):
+    """Measure inference latency of a compiled model.
+
+    Args:
+        model (tf.keras.Model): model to benchmark
+        input_shape (tuple): input shape (NEDOS, numOrbitals, numChannels)
+        batch_size (int): number of samples per call
+        repeats (int): number of timed calls
+        jit_compile (bool, optional): compile with XLA. Defaults to False.
+
+    Returns:
+        float: median latency per sample in ms
+
+    """
+    # Check args
+    assert isinstance(batch_size, int) and batch_size >= 1
+    assert isinstance(repeats, int) and repeats >= 1
+
+    compiled_model = tf.function(lambda x: model(x, training=False),
+                                 input_signature=[tf.TensorSpec(shape=(None, *input_shape), dtype=tf.float32)],
+                                 jit_compile=jit_compile)
+    batch = tf.random.uniform((batch_size, *input_shape))
+
+    # Warm up (tracing)
+    compiled_model(batch).numpy()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        compiled_model(batch).numpy()
+        timings.append(time.perf_counter() - start)
+
+    return float(np.median(timings)) / batch_size * 1e3
+
+
+def evaluate_mae(model, dataset):
+    """Evaluate mean absolute error of a model on a batched dataset.
+
+    Args:
+        model (tf.keras.Model): model to evaluate
+        dataset (tf.data.Dataset): batched dataset of (features, labels)
+
+    Returns:
+        float: mean absolute error
+
+    """
+    errors = [np.abs(labels.numpy().flatten() - model(features, training=False).numpy().flatten())
+              for features, labels in dataset]
+
+    return float(np.concatenate(errors).mean())
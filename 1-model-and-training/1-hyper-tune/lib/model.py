@@ -2,10 +2,24 @@
 # -*- coding: utf-8 -*-
 
 
+import numpy as np
 import tensorflow as tf
 
 
 def cnn_for_dos(input_shape, drop_out_rate):
+    """Build CNN4DOS with one branch per orbital.
+
+    Args:
+        input_shape (tuple): input shape (NEDOS, numOrbitals, numChannels)
+        drop_out_rate (float): drop out rate
+
+    Notes:
+        For a coarser energy grid, resample DOS before the model (see resample_dos and model_training: nedos).
+
+    """
+    # Check args
+    assert len(input_shape) == 3
+    numSamplings, numOrbitals, numChannels = input_shape
 
     def branch(branch_input, drop_out_rate):
         """Each branch of the CNN network.
@@ -14,12 +28,12 @@ def cnn_for_dos(input_shape, drop_out_rate):
             branch_input: input of each branch
 
         Notes:
-            expecting (batch_size, 4000, numOrbitals, numChannels) input
+            expecting (batch_size, NEDOS, numOrbitals, numChannels) input
 
         """
 
-        # Reshape (None, 4000, 6) to (None, 4000, 1, 6)
-        branch_input = tf.keras.layers.Reshape(target_shape=(4000, 1, 6))(branch_input)
+        # Reshape (None, NEDOS, numChannels) to (None, NEDOS, 1, numChannels)
+        branch_input = tf.keras.layers.Reshape(target_shape=(numSamplings, 1, numChannels))(branch_input)
 
         # 1st Conv layer
         conv_1 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(branch_input)
@@ -56,20 +70,11 @@ def cnn_for_dos(input_shape, drop_out_rate):
     master_input = tf.keras.Input(shape=input_shape, name="master_input")
 
     # Assign input and get output for each branch
-    # branch_shape = input_shape[0]
-    branch_output_0 = branch((master_input[:, :, 0]), drop_out_rate=drop_out_rate)
-    branch_output_1 = branch((master_input[:, :, 1]), drop_out_rate=drop_out_rate)
-    branch_output_2 = branch((master_input[:, :, 2]), drop_out_rate=drop_out_rate)
-    branch_output_3 = branch((master_input[:, :, 3]), drop_out_rate=drop_out_rate)
-    branch_output_4 = branch((master_input[:, :, 4]), drop_out_rate=drop_out_rate)
-    branch_output_5 = branch((master_input[:, :, 5]), drop_out_rate=drop_out_rate)
-    branch_output_6 = branch((master_input[:, :, 6]), drop_out_rate=drop_out_rate)
-    branch_output_7 = branch((master_input[:, :, 7]), drop_out_rate=drop_out_rate)
-    branch_output_8 = branch((master_input[:, :, 8]), drop_out_rate=drop_out_rate)
+    branch_outputs = [branch((master_input[:, :, i]), drop_out_rate=drop_out_rate) for i in range(numOrbitals)]
 
 
-    # Concatenate branch outputs
-    concat_output = tf.keras.layers.Concatenate(axis=-1)([branch_output_0, branch_output_1, branch_output_2, branch_output_3, branch_output_4, branch_output_5, branch_output_6, branch_output_7, branch_output_8])
+    # Concatenate branch outputs (Concatenate needs at least two inputs)
+    concat_output = tf.keras.layers.Concatenate(axis=-1)(branch_outputs) if numOrbitals > 1 else branch_outputs[0]
 
 
     # Master output layer
@@ -82,3 +87,192 @@ def cnn_for_dos(input_shape, drop_out_rate):
                            outputs=master_output,
                            name="CNN4DOS",
                            )
+
+
+def cnn_for_dos_fused(input_shape, drop_out_rate, share_weights=True, orbital_embedding_dim=8):
+    """Build CNN4DOS with all orbital branches fused into one convolution stack.
+
+    Args:
+        input_shape (tuple): input shape (NEDOS, numOrbitals, numChannels)
+        drop_out_rate (float): drop out rate
+        share_weights (bool, optional): share branch weights across orbitals (orbitals folded into batch axis),
+            otherwise each orbital keeps its own weights (orbitals folded into channel axis as convolution groups). Defaults to True.
+        orbital_embedding_dim (int, optional): size of learned orbital embeddings appended to the flattened
+            convolution output of each orbital, used with share_weights only. 0 to disable. Defaults to 8.
+
+    Notes:
+        1. Branch layers match cnn_for_dos, but all orbitals are processed by single layer calls,
+            instead of numOrbitals separate subgraphs
+        2. Without weight sharing, the model is equivalent to cnn_for_dos (see fuse_branched_model)
+
+    """
+    # Check args
+    assert len(input_shape) == 3
+    numSamplings, numOrbitals, numChannels = input_shape
+    assert isinstance(orbital_embedding_dim, int) and orbital_embedding_dim >= 0
+
+    # Separate weights for each orbital: grouped form of cnn_for_dos
+    if not share_weights:
+        return fuse_branched_model(cnn_for_dos(input_shape, drop_out_rate), name="CNN4DOS_fused")
+
+    # Master input layer
+    master_input = tf.keras.Input(shape=input_shape, name="master_input")
+
+    # Fold orbitals into batch: (None, NEDOS, numOrbitals, numChannels) to (None * numOrbitals, NEDOS, 1, numChannels)
+    branch_input = tf.reshape(tf.transpose(master_input, perm=[0, 2, 1, 3]), (-1, numSamplings, 1, numChannels))
+
+    # 1st Conv layer
+    conv_1 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(branch_input)
+    conv_1 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(conv_1)
+    conv_1 = tf.keras.layers.Conv2D(16, (8, 1), (2, 1), activation="relu", padding="same")(conv_1)
+    conv_1 = tf.keras.layers.Dropout(drop_out_rate)(conv_1)
+
+
+    # 2nd Conv layer
+    conv_2 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(conv_1)
+    conv_2 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(conv_2)
+    conv_2 = tf.keras.layers.Conv2D(16, (8, 1), (2, 1), activation="relu", padding="same")(conv_2)
+    conv_2 = tf.keras.layers.Dropout(drop_out_rate)(conv_2)
+
+
+    # 3rd Conv layer
+    conv_3 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(conv_2)
+    conv_3 = tf.keras.layers.Conv2D(16, (3, 1), activation="relu", padding="same")(conv_3)
+    conv_3 = tf.keras.layers.Conv2D(16, (8, 1), (2, 1), activation="relu", padding="same")(conv_3)
+    conv_output = tf.keras.layers.Dropout(drop_out_rate)(conv_3)
+
+
+    ## Flatten and dense
+    conv_flat = tf.keras.layers.Flatten()(conv_output)
+
+    # Append orbital embeddings, so shared dense layers could tell orbitals apart
+    if orbital_embedding_dim > 0:
+        orbital_ids = tf.zeros_like(master_input[:, 0, :, 0], dtype=tf.int32) + tf.range(numOrbitals)
+        orbital_embedding = tf.keras.layers.Embedding(numOrbitals, orbital_embedding_dim, name="orbital_embedding")(orbital_ids)
+        conv_flat = tf.keras.layers.Concatenate(axis=-1)([conv_flat, tf.reshape(orbital_embedding, (-1, orbital_embedding_dim))])
+
+    # Branch output
+    branch_output = tf.keras.layers.Dense(64, activation="relu")(conv_flat)
+    branch_output = tf.keras.layers.Dense(64, activation="relu")(branch_output)
+    branch_output = tf.keras.layers.Dense(1)(branch_output)
+
+    # Unfold orbitals from batch: (None * numOrbitals, 1) to (None, numOrbitals)
+    concat_output = tf.reshape(branch_output, (-1, numOrbitals))
+
+
+    # Master output layer
+    master_flat = tf.keras.layers.Flatten()(concat_output)
+    master_output = tf.keras.layers.Dense(32)(master_flat)
+    master_output = tf.keras.layers.Dense(16)(master_output)
+    master_output = tf.keras.layers.Dense(1)(master_output)
+
+    return tf.keras.Model(inputs=master_input,
+                           outputs=master_output,
+                           name="CNN4DOS_shared",
+                           )
+
+
+def fuse_branched_model(model, name=None):
+    """Convert a multi-branch CNN4DOS (cnn_for_dos or hp_model) to grouped convolution form.
+
+    Each branch layer is replaced by one layer over all orbitals (orbitals as groups of the channel axis),
+    Conv2D by a grouped Conv2D and Dense by a grouped 1x1 Conv1D, with weights of all branches copied in.
+    Master layers after the Concatenate layer are reused (weights shared with model).
+
+    Args:
+        model (tf.keras.Model): multi-branch CNN, with master_input[:, :, i] fed to branch i
+        name (str, optional): name of fused model. Defaults to "{model.name}_fused".
+
+    Returns:
+        tf.keras.Model: fused model giving the same predictions as model (model itself for a single orbital)
+
+    Raises:
+        ValueError: if model does not have one Concatenate layer joining one branch per orbital
+
+    """
+    numSamplings, numOrbitals, numChannels = model.input_shape[1:]
+
+    # A single-orbital model has one branch (feeding master layers directly), nothing to fuse
+    if numOrbitals == 1:
+        return model
+
+    def collect_chain(tensor, stop_tensor):
+        """Collect single-input layers from stop_tensor (exclusive) to tensor, in call order."""
+        chain = []
+        while tensor is not stop_tensor:
+            layer = tensor._keras_history.layer
+            assert not isinstance(layer, tf.keras.layers.InputLayer) and not isinstance(layer.input, (list, tuple))
+            chain.append(layer)
+            tensor = layer.input
+
+        return chain[::-1]
+
+    def clone_layer(layer, **kwargs):
+        """Create a new layer from layer config, with updated config values."""
+        config = layer.get_config()
+        config.pop("name")
+        config.update(kwargs)
+
+        return type(layer).from_config(config)
+
+    # Find branches (excluding input slicing op) and master head
+    concat_layers = [layer for layer in model.layers if isinstance(layer, tf.keras.layers.Concatenate)]
+    if len(concat_layers) != 1 or len(concat_layers[0].input) != numOrbitals:
+        raise ValueError(f"Model {model.name} should have one Concatenate layer joining {numOrbitals} orbital branches.")
+    branch_chains = [collect_chain(i, model.input)[1:] for i in concat_layers[0].input]
+    head_chain = collect_chain(model.output, concat_layers[0].output)
+
+
+    # Master input layer
+    master_input = tf.keras.Input(shape=(numSamplings, numOrbitals, numChannels), name="master_input")
+
+    # Fold orbitals into channel groups
+    x = master_input
+    for layers in zip(*branch_chains):
+        layer = layers[0]
+        assert all(type(i) is type(layer) for i in layers)
+
+        # (None, NEDOS, numOrbitals, numChannels) to (None, NEDOS, 1, numOrbitals * numChannels)
+        if isinstance(layer, tf.keras.layers.Reshape):
+            x = tf.keras.layers.Reshape(target_shape=(*layer.target_shape[:-1], numOrbitals * numChannels))(x)
+
+        elif isinstance(layer, tf.keras.layers.Conv2D):
+            assert layer.groups == 1
+            fused_layer = clone_layer(layer, filters=numOrbitals * layer.filters, groups=numOrbitals)
+            x = fused_layer(x)
+            fused_layer.set_weights([np.concatenate(weights, axis=-1) for weights in zip(*[i.get_weights() for i in layers])])
+
+        elif isinstance(layer, (tf.keras.layers.AveragePooling2D, tf.keras.layers.MaxPooling2D, tf.keras.layers.Dropout)):
+            x = clone_layer(layer)(x)
+
+        # (None, H, W, numOrbitals * numFilters) to (None, 1, numOrbitals * H * W * numFilters), flattened per orbital
+        elif isinstance(layer, tf.keras.layers.Flatten):
+            _, height, width, channels = x.shape
+            x = tf.keras.layers.Reshape(target_shape=(height, width, numOrbitals, channels // numOrbitals))(x)
+            x = tf.keras.layers.Permute((3, 1, 2, 4))(x)
+            x = tf.keras.layers.Reshape(target_shape=(1, height * width * channels))(x)
+
+        # Dense of each orbital as grouped 1x1 convolution
+        elif isinstance(layer, tf.keras.layers.Dense):
+            fused_layer = tf.keras.layers.Conv1D(numOrbitals * layer.units, 1, groups=numOrbitals,
+                                                 activation=layer.activation, use_bias=layer.use_bias)
+            x = fused_layer(x)
+            weights = [np.concatenate(weights, axis=-1) for weights in zip(*[i.get_weights() for i in layers])]
+            weights[0] = weights[0][None]  # kernel (numFeatures, numOrbitals * units) to (1, numFeatures, numOrbitals * units)
+            fused_layer.set_weights(weights)
+
+        else:
+            raise ValueError(f"Layer {layer.name} of type {type(layer).__name__} could not be fused.")
+
+    # (None, 1, numOrbitals) to (None, numOrbitals), in orbital order as Concatenate output
+    x = tf.keras.layers.Flatten()(x)
+
+
+    # Master output layers
+    for layer in head_chain:
+        x = layer(x)
+
+    return tf.keras.Model(inputs=master_input,
+                           outputs=x,
+                           name=name or f"{model.name}_fused",
+                           )
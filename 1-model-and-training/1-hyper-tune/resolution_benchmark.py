@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+import os
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+import pandas as pd
+import tensorflow as tf
+import time
+import yaml
+
+from lib.benchmark import measure_latency
+from lib.data_pipeline import load_features_and_labels, split_dataset
+from lib.dataset import resample_dos
+from lib.model import cnn_for_dos
+
+
+# Main Loop
+if __name__ == "__main__":
+    # Set global random seed
+    tf.random.set_seed(0)
+    np.random.seed(0)
+
+    # Load configs
+    with open("config.yaml") as ymlfile:
+        cfg = yaml.safe_load(ymlfile)
+    ## model training
+    batch_size = cfg["model_training"]["batch_size"]
+    validation_ratio = cfg["model_training"]["validation_ratio"]
+    ## resolution benchmark
+    benchmark_cfg = cfg["resolution_benchmark"]
+
+
+    # Load features(DOS) and labels at original resolution
+    features, labels = load_features_and_labels(cfg)
+
+
+    # Train and benchmark CNN4DOS for each resolution
+    results = []
+    for nedos in benchmark_cfg["nedos"]:
+        # Resample features (numSamples, NEDOS, numOrbitals, numChannels) along NEDOS axis
+        resampled_features = resample_dos(np.asarray(features, dtype=np.float32), nedos, axis=1)
+        input_shape = resampled_features.shape[1:]
+
+        # Same split (as keras-tuner.py) for all resolutions
+        tf.random.set_seed(0)
+        train_set, val_set = split_dataset(resampled_features, labels, validation_ratio, batch_size)
+
+        # Build and train model
+        model = cnn_for_dos(input_shape, drop_out_rate=benchmark_cfg["drop_out_rate"])
+        model.compile(
+            optimizer=tf.keras.optimizers.legacy.Adam(learning_rate=benchmark_cfg["learning_rate"]),
+            loss=tf.keras.losses.MeanSquaredError(),
+            metrics=[tf.keras.metrics.mean_absolute_error, ],
+        )
+
+        start = time.perf_counter()
+        history = model.fit(train_set, validation_data=val_set,
+                            epochs=benchmark_cfg["epochs"],
+                            verbose=2,
+                            callbacks=[
+                                tf.keras.callbacks.EarlyStopping(monitor="val_mean_absolute_error", patience=benchmark_cfg["patience"], restore_best_weights=True),
+                                tf.keras.callbacks.ReduceLROnPlateau(monitor="val_mean_absolute_error", patience=10, factor=0.5, min_lr=1e-7),
+                            ],
+                            )
+        training_time = time.perf_counter() - start
+
+        # Record accuracy/latency trade-off
+        results.append({
+            "nedos": nedos,
+            "params": model.count_params(),
+            "val_mae": min(history.history["val_mean_absolute_error"]),
+            "epochs": len(history.history["loss"]),
+            "training_time_per_epoch_s": training_time / len(history.history["loss"]),
+            "latency_per_sample_ms": measure_latency(model, input_shape,
+                                                     benchmark_cfg["latency_batch_size"],
+                                                     benchmark_cfg["latency_repeats"]),
+        })
+        print(results[-1])
+
+
+    # Summarize results relative to the first (reference) resolution
+    results = pd.DataFrame(results).set_index("nedos")
+    results["speedup"] = results["latency_per_sample_ms"].iloc[0] / results["latency_per_sample_ms"]
+    results["val_mae_change"] = results["val_mae"] - results["val_mae"].iloc[0]
+
+    print(results.to_string())
+    results.to_csv(benchmark_cfg["results_file"])
@@ -0,0 +1,157 @@
+"""Load features and labels for CNN from cache or dataset."""
+
+
+import os
+from pathlib import Path
+import numpy as np
+
+from .dataset import Dataset, resample_dos
+from .feature_cache import FeatureCache
+
+
+def load_features_and_labels(cfg, nedos=None) -> tuple:
+    """Load features (DOS) and labels from cache keyed by config and source files.
+
+    Args:
+        cfg (dict): config loaded from config.yaml (sections "path", "species", "cache" and "model_training")
+        nedos (int, optional): downsample features to nedos samplings (see resample_dos). Defaults to None (no resampling).
+
+    Returns:
+        np.ndarray: features in shape (numSamples, NEDOS, numOrbitals, numChannels)
+        np.ndarray: labels in shape (numSamples, )
+
+    Notes:
+        1. Packed dataset is used only if it was built with a loading config covering the current one
+        2. Features are cached at original resolution, resampling is applied after loading
+
+    """
+    # paths
+    feature_dir = Path(cfg["path"]["feature_dir"])
+    label_dir = Path(cfg["path"]["label_dir"])
+    packed_feature_dir = cfg["path"].get("packed_feature_dir")
+    # species
+    substrates = list(cfg["species"]["substrates"])  # load_feature extends it with augmentations
+    adsorbates = cfg["species"]["adsorbates"]
+    centre_atoms = cfg["species"]["centre_atoms"]
+    append_adsorbate_dos = cfg["species"]["append_adsorbate_dos"]
+    load_augmentation = cfg["species"]["load_augmentation"]
+    augmentations = cfg["species"]["augmentations"]
+    spin = cfg["species"]["spin"]
+    states = cfg["species"]["states"]
+    # model training
+    preprocessing = cfg["model_training"]["preprocessing"]
+    remove_ghost = cfg["model_training"]["remove_ghost"]
+
+    # Collect source files for cache fingerprint
+    use_packed = bool(packed_feature_dir) and Dataset.check_packed_feature(
+        packed_feature_dir,
+        substrates,
+        adsorbates,
+        centre_atoms,
+        states=states,
+        spin=spin,
+        load_augment=load_augmentation,
+        augmentations=augmentations,
+    )
+    if use_packed:
+        source_dirs = [packed_feature_dir]
+    else:
+        source_dirs = [feature_dir / sub for sub in substrates]
+        if load_augmentation:
+            source_dirs.extend(feature_dir / f"{sub}_aug" for sub in substrates)
+    if append_adsorbate_dos:
+        source_dirs.append(feature_dir / "adsorbate-DOS")
+
+    feature_cache = FeatureCache(
+        cfg["cache"]["cache_dir"], max_entries=cfg["cache"]["max_entries"]
+    )
+    cache_key = feature_cache.fingerprint(
+        fields={
+            "species": cfg["species"],
+            "states": states,
+            "preprocessing": preprocessing,
+            "remove_ghost": remove_ghost,
+        },
+        source_paths=[*source_dirs, label_dir],
+    )
+    cached = feature_cache.load(cache_key)
+
+    if cached is not None:
+        features, labels = cached
+        print(f"features/labels loaded from cache {cache_key[:12]}.")
+
+    else:
+        # Load dataset
+        dataFetcher = Dataset()
+
+        # Load feature (from packed dataset if available)
+        if use_packed:
+            dataFetcher.load_packed_feature(
+                packed_feature_dir,
+                substrates,
+                adsorbates,
+                centre_atoms,
+                states=states,
+                spin=spin,
+                remove_ghost=remove_ghost,
+                load_augment=load_augmentation,
+                augmentations=augmentations,
+            )
+        else:
+            dataFetcher.load_feature(
+                feature_dir,
+                substrates,
+                adsorbates,
+                centre_atoms,
+                states=states,
+                spin=spin,
+                remove_ghost=remove_ghost,
+                load_augment=load_augmentation,
+                augmentations=augmentations,
+            )
+
+        # Append molecule DOS
+        if append_adsorbate_dos:
+            dataFetcher.append_adsorbate_DOS(
+                adsorbate_dos_dir=os.path.join(feature_dir, "adsorbate-DOS")
+            )
+
+        # Preprocess feature (DOS)
+        dataFetcher.scale_feature(mode=preprocessing)
+
+        # Load label
+        dataFetcher.load_label(label_dir)
+
+        # Combine feature and label
+        features = np.array(list(dataFetcher.feature.values()))
+        labels = np.array(list(dataFetcher.label.values()))
+        feature_cache.save(cache_key, features, labels)
+        print(f"Cache {cache_key[:12]} generated.")
+
+    # Resample to a coarser energy grid upon request
+    if nedos is not None:
+        features = resample_dos(features, nedos, axis=1)
+
+    return features, labels
+
+
+def get_input_shape(cfg) -> tuple:
+    """Get model input shape from config, without loading the dataset.
+
+    Args:
+        cfg (dict): config loaded from config.yaml (sections "species" and "model_training")
+
+    Returns:
+        tuple: input shape (NEDOS, numOrbitals, numChannels), as features from load_features_and_labels(cfg, nedos)
+
+    """
+    # One channel per spin, followed by adsorbate DOS channels if appended
+    num_channels = 2 if cfg["species"]["spin"] == "both" else 1
+    if cfg["species"]["append_adsorbate_dos"]:
+        num_channels += cfg["model_training"]["adsorbate_dos_channels"]
+
+    return (
+        cfg["model_training"]["nedos"],
+        cfg["model_training"]["num_orbitals"],
+        num_channels,
+    )
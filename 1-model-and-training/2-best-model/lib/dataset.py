@@ -1,6 +1,7 @@
 """Dataset class for loading and manipulating DOS dataset for CNN."""
 
 
+import json
 import os
 import numpy as np
 import pandas as pd
@@ -8,6 +9,36 @@ from sklearn.preprocessing import normalize
 import warnings
 
 
+def resample_dos(arr, nedos, axis=0) -> np.ndarray:
+    """Downsample DOS array to a coarser energy grid by averaging neighbouring samplings.
+
+    Args:
+        arr (np.ndarray): DOS array
+        nedos (int): number of samplings after resampling, should divide the original number
+        axis (int, optional): NEDOS axis. Defaults to 0.
+
+    Returns:
+        np.ndarray: resampled DOS array, with nedos samplings along axis
+
+    Notes:
+        Averaging (instead of taking every n-th point) keeps narrow peaks and the scale of the DOS.
+
+    """
+    # Check args
+    axis = axis % arr.ndim
+    assert isinstance(nedos, int) and nedos >= 1
+    assert arr.shape[axis] % nedos == 0
+
+    factor = arr.shape[axis] // nedos
+    if factor == 1:
+        return arr
+
+    # Split NEDOS axis into (nedos, factor) and average over factor
+    return arr.reshape(*arr.shape[:axis], nedos, factor, *arr.shape[axis + 1 :]).mean(
+        axis=axis + 1
+    )
+
+
 class Dataset:
     """Dataset class for loading and manipulating DOS dataset for Deep Learning.
 
@@ -172,8 +203,231 @@ class Dataset:
         self.feature = feature_data
         self.numFeature = len(feature_data)
         self.featureKeySep = keysep
+        self.loading_config = {
+            "substrates": [i for i in substrates if not i.endswith("_aug")],
+            "adsorbates": list(adsorbates),
+            "centre_atoms": dict(centre_atoms),
+            "states": sorted(states),
+            "spin": spin,
+            "augmentations": list(augmentations) if load_augment else None,
+        }
+
+    def save_packed_feature(self, packed_dir, spin="up") -> None:
+        """Pack loaded DOS feature into one contiguous array with a key index.
+
+        Args:
+            packed_dir (str): directory to store packed dataset
+            spin (str): spin of loaded feature, "up", "down" or "both"
+
+        Notes:
+            1. DOS arrays are stacked into "dos_{spin}.npy" in shape (numSamples, NEDOS, numOrbital(, 2))
+            2. Keys ("{substrate}:{adsorbate}:{state}:{folder}") are stored in "index.json" in row order,
+               with the loading config (see load_feature) the pack was built with
+            3. Pack raw DOS (remove_ghost=False), ghost state removal is applied at loading
+
+        """
+        # Check args
+        assert spin in {"up", "down", "both"}
+        assert self.numFeature >= 1
+        os.makedirs(packed_dir, exist_ok=True)
+
+        # Write DOS arrays into a single contiguous file
+        keys = list(self.feature.keys())
+        packed = np.lib.format.open_memmap(
+            os.path.join(packed_dir, f"dos_{spin}.npy"),
+            mode="w+",
+            dtype=self.feature[keys[0]].dtype,
+            shape=(len(keys), *self.feature[keys[0]].shape),
+        )
+        for row, key in enumerate(keys):
+            packed[row] = self.feature[key]
+        packed.flush()
+        del packed
+
+        # Write key index (keys always separated by ":")
+        index = [key.split(self.featureKeySep) for key in keys]
+        with open(os.path.join(packed_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "spin": spin,
+                    "config": self.loading_config,
+                    "keys": [":".join(i) for i in index],
+                },
+                f,
+                indent=1,
+            )
+
+    @staticmethod
+    def check_packed_feature(
+        packed_dir,
+        substrates,
+        adsorbates,
+        centre_atoms,
+        states=("is", "fs"),
+        spin="up",
+        load_augment=False,
+        augmentations=None,
+    ) -> bool:
+        """Check if packed dataset was built with a loading config covering the requested one.
+
+        Args:
+            packed_dir (str): packed dataset directory
+            substrates (list): list of substrates to load (without "_aug" ones)
+            adsorbates (list): list of adsorbates to load
+            centre_atoms (dict): centre atom index dict (index starts from 1)
+            states (tuple): list of states, "is" for initial state, "fs" for final state
+            spin (str): load spin "up" or "down" DOS, or "both"
+            load_augment (bool): load augmentation data or not
+            augmentations (list): list of augmentation distances
+
+        Returns:
+            bool: True if all requested samples are in the packed dataset, loaded with the same centre atoms and spin
+
+        """
+        index_file = os.path.join(packed_dir, "index.json")
+        if not os.path.isfile(index_file):
+            return False
+
+        with open(index_file, encoding="utf-8") as f:
+            packed_config = json.load(f).get("config")
+
+        # Packed datasets built without a recorded config cannot be checked
+        if packed_config is None:
+            warnings.warn(
+                f"Packed dataset {packed_dir} has no loading config recorded, please repack."
+            )
+            return False
+
+        mismatches = []
+        if packed_config["spin"] != spin:
+            mismatches.append("spin")
+        if not set(substrates) <= set(packed_config["substrates"]):
+            mismatches.append("substrates")
+        if not set(adsorbates) <= set(packed_config["adsorbates"]):
+            mismatches.append("adsorbates")
+        if not set(states) <= set(packed_config["states"]):
+            mismatches.append("states")
+        if any(
+            packed_config["centre_atoms"].get(sub) != centre_atoms[sub]
+            for sub in substrates
+        ):
+            mismatches.append("centre_atoms")
+        if load_augment and (
+            packed_config["augmentations"] is None
+            or not set(augmentations) <= set(packed_config["augmentations"])
+        ):
+            mismatches.append("augmentations")
+
+        if mismatches:
+            warnings.warn(
+                f"Packed dataset {packed_dir} does not match requested {', '.join(mismatches)}."
+            )
+
+        return not mismatches
+
+    def load_packed_feature(
+        self,
+        packed_dir,
+        substrates,
+        adsorbates,
+        centre_atoms,
+        states=("is", "fs"),
+        spin="up",
+        load_augment=False,
+        augmentations=None,
+        keysep=":",
+        remove_ghost=False,
+    ) -> None:
+        """Load DOS dataset feature from packed dataset (see save_packed_feature).
+
+        Args:
+            packed_dir (str): packed dataset directory
+            substrates (list): list of substrates to load
+            adsorbates (list): list of adsorbates to load
+            centre_atoms (dict): centre atom index dict (index starts from 1), checked against packed dataset
+            states (tuple): list of states, "is" for initial state, "fs" for final state
+            spin (str): load spin "up" or "down" DOS, or "both"
+            load_augment (bool): load augmentation data or not, augmented substrate should end with "_aug"
+            augmentations (list): list of augmentation distances
+            keysep (str): separator for dir and project name in dataset dict
+            remove_ghost (bool): remove ghost state (first point of NEDOS)
+
+        Notes:
+            1. Packed array is memory-mapped, feature values are views into it (no per-sample file access)
+            2. With remove_ghost, the array is mapped copy-on-write, so only the zeroed pages are copied
+
+        """
+        # Check args
+        assert os.path.isdir(packed_dir)
+        assert isinstance(substrates, list)
+        assert isinstance(adsorbates, list)
+        for state in states:
+            assert state in {"is", "fs"}
+        assert spin in {"up", "down", "both"}
+        assert isinstance(load_augment, bool)
+        assert isinstance(remove_ghost, bool)
+        assert self.check_packed_feature(
+            packed_dir,
+            substrates,
+            adsorbates,
+            centre_atoms,
+            states,
+            spin,
+            load_augment,
+            augmentations,
+        ), f"Packed dataset {packed_dir} was built with a different loading config, please repack."
+
+        # Append augmentation to substrates if required
+        if load_augment:
+            assert isinstance(augmentations, list)
+            for i in augmentations:
+                assert isinstance(i, str)
+            substrates.extend([f"{i}_aug" for i in substrates])
+            print(f"Augmentation data would be loaded: {augmentations}")
+
+        # Warning user if ghost removal activated
+        if remove_ghost:
+            warnings.warn("Ghost state removal activated.")
+
+        # Update attrib
+        self.substrates = substrates
+        self.adsorbates = adsorbates
+
+        # Load key index and memory-map packed DOS
+        with open(os.path.join(packed_dir, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        packed = np.load(
+            os.path.join(packed_dir, f"dos_{spin}.npy"),
+            mmap_mode="c" if remove_ghost else "r",
+        )
+        assert packed.shape[0] == len(index["keys"])
+
+        # Select requested samples
+        feature_data = {}
+        for row, packed_key in enumerate(index["keys"]):
+            sub, ads, state, folder = packed_key.split(":")
+            if sub not in substrates or ads not in adsorbates or state not in states:
+                continue
+
+            # Do augmentation distance check for augmented data
+            if sub.endswith("_aug") and folder.split("_")[-1] not in augmentations:
+                continue
+
+            arr = packed[row]
+
+            # Zero out first point along NEDOS axis to remove "ghost state"
+            if remove_ghost:
+                arr[0] = 0.0
+
+            # Compile dict key as "{substrate}{keysep}{adsorbate}{keysep}{state}"
+            feature_data[f"{sub}{keysep}{ads}{keysep}{state}{keysep}{folder}"] = arr
+
+        # Update attrib
+        self.feature = feature_data
+        self.numFeature = len(feature_data)
+        self.featureKeySep = keysep
 
-    def scale_feature(self, mode) - None:
+    def scale_feature(self, mode) -> None:
         """Scale feature arrays.
 
         Args:
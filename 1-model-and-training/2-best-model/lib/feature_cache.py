@@ -0,0 +1,131 @@
+"""Config-fingerprinted cache for loaded features and labels."""
+
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+
+class FeatureCache:
+    """Feature/label cache keyed by config fingerprint, with LRU eviction.
+
+    Attributes:
+        cache_dir (str): cache directory, each entry stored in "{cache_dir}/{key}"
+        max_entries (int): maximum number of cache entries kept
+
+    """
+
+    def __init__(self, cache_dir="feature_cache", max_entries=4) -> None:
+        assert isinstance(max_entries, int) and max_entries >= 1
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _scan_sources(self, source_paths):
+        """Summarize source files by count and latest modification time.
+
+        Args:
+            source_paths (list): files or directories (scanned recursively)
+
+        Returns:
+            list: [path, number of files, latest mtime in ns] for each source
+
+        """
+        summary = []
+        for path in source_paths:
+            path = str(path)
+            if not os.path.exists(path):
+                summary.append([path, 0, 0])
+                continue
+
+            num_files = 0
+            latest_mtime = os.stat(path).st_mtime_ns
+            for dirpath, _, filenames in os.walk(path):
+                for file in filenames:
+                    num_files += 1
+                    latest_mtime = max(latest_mtime, os.stat(os.path.join(dirpath, file)).st_mtime_ns)
+
+            summary.append([path, num_files, latest_mtime])
+
+        return summary
+
+    def fingerprint(self, fields, source_paths) -> str:
+        """Compute cache key from config fields and source files.
+
+        Args:
+            fields (dict): config fields affecting features/labels (JSON serializable)
+            source_paths (list): source files or directories of features/labels
+
+        Returns:
+            str: cache key (SHA-256 hex digest)
+
+        """
+        content = json.dumps(
+            {"fields": fields, "sources": self._scan_sources(source_paths)},
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def load(self, key):
+        """Load cached features and labels.
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            tuple: (features, labels) as np.ndarray, or None if not cached
+
+        """
+        entry = os.path.join(self.cache_dir, key)
+        if not (
+            os.path.exists(os.path.join(entry, "features.npy"))
+            and os.path.exists(os.path.join(entry, "labels.npy"))
+        ):
+            return None
+
+        # Mark entry as recently used
+        os.utime(entry)
+
+        return np.load(os.path.join(entry, "features.npy")), np.load(
+            os.path.join(entry, "labels.npy")
+        )
+
+    def save(self, key, features, labels) -> None:
+        """Save features and labels to cache, then evict least recently used entries.
+
+        Args:
+            key (str): cache key
+            features (np.ndarray): feature array
+            labels (np.ndarray): label array
+
+        """
+        assert len(features) == len(labels)
+
+        # Write into temporary dir first so interrupted writes never leave a valid entry
+        entry = os.path.join(self.cache_dir, key)
+        tmp_entry = f"{entry}.tmp"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        np.save(os.path.join(tmp_entry, "features.npy"), features)
+        np.save(os.path.join(tmp_entry, "labels.npy"), labels)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries beyond max_entries."""
+        entries = [
+            os.path.join(self.cache_dir, i)
+            for i in os.listdir(self.cache_dir)
+            if os.path.isdir(os.path.join(self.cache_dir, i)) and not i.endswith(".tmp")
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+
+        for entry in entries[self.max_entries :]:
+            shutil.rmtree(entry)
@@ -1,19 +1,29 @@
 """Save best CNN model."""
 
 
+import functools
 import keras_tuner
 import os
+import yaml
 
 from hp_model import hp_model
+from lib.data_pipeline import get_input_shape
 
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 
 
 # Main Loop
 if __name__ == "__main__":
+    # Load configs
+    with open("config.yaml", encoding="utf-8") as ymlfile:
+        cfg = yaml.safe_load(ymlfile)
+
+    # Get model input shape from config (features are not needed to restore the model)
+    input_shape = get_input_shape(cfg)
+
     # Initiate Keras Tuner
     tuner = keras_tuner.Hyperband(
-        hypermodel=hp_model,
+        hypermodel=functools.partial(hp_model, input_shape=input_shape),
         max_epochs=200,
         factor=3,
         overwrite=False,
@@ -25,7 +35,7 @@ if __name__ == "__main__":
     # Load best model
     best_model = tuner.get_best_models(num_models=1)[0]
 
-    best_model.build(input_shape=(None, 4000, 9, 6))
+    best_model.build(input_shape=(None, *input_shape))
     best_model.summary()
 
     # Save best model
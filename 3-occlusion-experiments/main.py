@@ -1,6 +1,7 @@
 """Main for eDOS occlusion experiments."""
 
 
+import json
 import os
 from pathlib import Path
 import numpy as np
@@ -13,13 +14,395 @@ root_dir = Path(__file__).parent
 shared_components_dir = root_dir / "../shared_components/src"
 sys.path.append(str(shared_components_dir.resolve()))
 
+from src.adaptiveOcclusion import AdaptiveOcclusion
+from src.gradientAttribution import GradientAttribution, attribution_to_occlusion
 from src.occlusionGenerator import occlusionGenerator
 from src.occlusionPlotter import OcclusionPlotter
-from src.utilities import get_fermi_level
+from src.utilities import (
+    find_experiment_folders,
+    get_adsorbate_dos_path,
+    get_fermi_level,
+    get_properties_from_path,
+)
 
 from cnnPredictor import CNNPredictor
 from dataLoader import DataLoader
 from dosProcessor import DOSProcessor
+from incrementalCNN import IncrementalCNN
+
+
+def run_occlusion(
+    generator: occlusionGenerator,
+    cnn_predictor: CNNPredictor,
+    processed_dos: np.ndarray,
+    adsorbate_dos: np.ndarray,
+    batch_size: int,
+    output_file=None,
+    branch_cache: bool = False,
+    incremental: bool = False,
+    ref_prediction: float = None,
+    engine: IncrementalCNN = None,
+) -> np.ndarray:
+    """
+    Stream occlusion batches through batched inference.
+
+    Args:
+        generator (occlusionGenerator): Occlusion generator of the DOS.
+        cnn_predictor (CNNPredictor): CNN predictor.
+        processed_dos (np.ndarray): Unoccluded DOS of shape (numSamplings, numOrbitals, 1).
+        adsorbate_dos (np.ndarray): Adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+        batch_size (int): Number of occlusion arrays per model call.
+        output_file (Path, optional): Write predictions incrementally to this .npy file. Defaults to None.
+        branch_cache (bool, optional): Recompute only the branch of the occluded orbital. Defaults to False.
+        incremental (bool, optional): Recompute only conv activations in the receptive field of
+            each window from cached reference activations (exact, CNN4DOS-type models). Defaults to False.
+        ref_prediction (float, optional): Prediction of the unoccluded DOS, computed if not given
+            (ignored if incremental, the engine's reference prediction is used). Defaults to None.
+        engine (IncrementalCNN, optional): Incremental engine of the unoccluded DOS, built if not given. Defaults to None.
+
+    Returns:
+        np.ndarray: Prediction differences to the unoccluded DOS, shape (num_occlusions, numOrbitals).
+    """
+    # Calculate reference point (from the engine on the incremental path, so unperturbed windows give zero)
+    if incremental:
+        if engine is None:
+            engine = IncrementalCNN(cnn_predictor.model, processed_dos, adsorbate_dos)
+        ref_prediction = engine.reference_prediction
+    elif ref_prediction is None:
+        ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)[0]
+
+    # Allocate predictions (memory-mapped .npy if output file given)
+    shape = (generator.num_occlusions, processed_dos.shape[1])
+    if output_file is not None:
+        predictions = np.lib.format.open_memmap(
+            output_file, mode="w+", dtype=np.float32, shape=shape
+        )
+    else:
+        predictions = np.empty(shape, dtype=np.float32)
+
+    # Make prediction along each orbital, batch by batch
+    with tqdm(total=shape[0] * shape[1], desc="Making Predictions") as pbar:
+        if incremental:
+            for orbital_index, window_indices, lo, hi in generator.iter_occlusion_windows(
+                batch_size
+            ):
+                predictions[window_indices, orbital_index] = (
+                    engine.predict_occlusions(orbital_index, lo, hi) - ref_prediction
+                )
+                pbar.update(len(window_indices))
+
+        else:
+            for orbital_index, window_indices, occluded_arrays in generator.iter_occlusion_batches(
+                batch_size
+            ):
+                predictions[window_indices, orbital_index] = (
+                    cnn_predictor.predict_batch(
+                        occluded_arrays,
+                        adsorbate_dos,
+                        batch_size=batch_size,
+                        perturbed_orbitals=[orbital_index] if branch_cache else None,
+                    )
+                    - ref_prediction
+                )
+                pbar.update(len(window_indices))
+
+    if isinstance(predictions, np.memmap):
+        predictions.flush()
+
+    return np.asarray(predictions)
+
+
+def run_adaptive_occlusion(
+    generator: occlusionGenerator,
+    cnn_predictor: CNNPredictor,
+    processed_dos: np.ndarray,
+    adsorbate_dos: np.ndarray,
+    config: dict,
+    ref_prediction: float = None,
+    engine: IncrementalCNN = None,
+) -> AdaptiveOcclusion:
+    """
+    Run coarse-to-fine occlusion, refining only windows with large prediction changes.
+
+    Args:
+        generator (occlusionGenerator): Occlusion generator of the DOS.
+        cnn_predictor (CNNPredictor): CNN predictor.
+        processed_dos (np.ndarray): Unoccluded DOS of shape (numSamplings, numOrbitals, 1).
+        adsorbate_dos (np.ndarray): Adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+        config (dict): Configuration dictionary.
+        ref_prediction (float, optional): Prediction of the unoccluded DOS, computed if not given
+            (ignored if incremental, the engine's reference prediction is used). Defaults to None.
+        engine (IncrementalCNN, optional): Incremental engine of the unoccluded DOS, built if not given. Defaults to None.
+
+    Returns:
+        AdaptiveOcclusion: Refined adaptive occlusion, see to_dense for OcclusionPlotter input.
+    """
+    occlusion_config = config["occlusion"]
+    adaptive_config = occlusion_config["adaptive"]
+    batch_size = occlusion_config["batch_size"]
+
+    # Reference point from the engine on the incremental path, so unperturbed windows give zero
+    if occlusion_config["incremental"]:
+        if engine is None:
+            engine = IncrementalCNN(cnn_predictor.model, processed_dos, adsorbate_dos)
+        ref_prediction = engine.reference_prediction
+    elif ref_prediction is None:
+        ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)[0]
+
+    def predict_windows(orbital_index, lo, hi):
+        """Predict occluded DOS for windows [lo, hi) of one orbital, batch by batch."""
+        predictions = np.empty(len(lo), dtype=np.float32)
+        for start in range(0, len(lo), batch_size):
+            batch = slice(start, start + batch_size)
+            if occlusion_config["incremental"]:
+                predictions[batch] = engine.predict_occlusions(orbital_index, lo[batch], hi[batch])
+            else:
+                occluded_arrays = generator._occlude_windows(
+                    np.full(len(lo[batch]), orbital_index), lo[batch], hi[batch]
+                )
+                predictions[batch] = cnn_predictor.predict_batch(
+                    occluded_arrays[..., np.newaxis],
+                    adsorbate_dos,
+                    batch_size=batch_size,
+                    perturbed_orbitals=[orbital_index] if occlusion_config["branch_cache"] else None,
+                )
+
+        return predictions - ref_prediction
+
+    adaptive = AdaptiveOcclusion(
+        numSamplings=processed_dos.shape[0],
+        numOrbitals=processed_dos.shape[1],
+        occlusion_width=occlusion_config["occlusion_width"],
+        occlusion_step=occlusion_config["occlusion_step"],
+        initial_width=adaptive_config["initial_width"],
+        split_factor=adaptive_config["split_factor"],
+        threshold=adaptive_config["threshold"],
+        top_fraction=adaptive_config["top_fraction"],
+    ).refine(predict_windows)
+
+    print(
+        f"Adaptive occlusion made {adaptive.num_predictions} predictions "
+        f"({generator.num_occlusions * processed_dos.shape[1]} for uniform occlusion)."
+    )
+
+    return adaptive
+
+
+def compute_attributions(
+    method: str,
+    attribution: GradientAttribution,
+    processed_dos: np.ndarray,
+    adsorbate_dos: np.ndarray,
+    config: dict,
+) -> np.ndarray:
+    """
+    Compute gradient attributions of the prediction to each energy point and orbital.
+
+    Args:
+        method (str): "saliency" (gradient x DOS) or "integrated_gradients" (zero DOS baseline).
+        attribution (GradientAttribution): Gradient attribution of the CNN model.
+        processed_dos (np.ndarray): Unoccluded DOS of shape (numSamplings, numOrbitals, 1).
+        adsorbate_dos (np.ndarray): Adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+        config (dict): Configuration dictionary.
+
+    Returns:
+        np.ndarray: Attributions of shape (numSamplings, numOrbitals).
+    """
+    if method == "saliency":
+        attributions = (
+            attribution.saliency(processed_dos, adsorbate_dos) * processed_dos[..., 0]
+        )
+    elif method == "integrated_gradients":
+        attributions = attribution.integrated_gradients(
+            processed_dos,
+            adsorbate_dos,
+            num_steps=config["attribution"]["integration_steps"],
+            batch_size=config["occlusion"]["batch_size"],
+        )
+    else:
+        raise ValueError(
+            f"Unknown attribution method {method}, should be occlusion, saliency or integrated_gradients."
+        )
+
+    return attributions
+
+
+def run_attribution(
+    method: str,
+    attribution: GradientAttribution,
+    processed_dos: np.ndarray,
+    adsorbate_dos: np.ndarray,
+    config: dict,
+) -> np.ndarray:
+    """
+    Estimate occlusion predictions from gradient attributions.
+
+    Args:
+        method (str): "saliency" (gradient x DOS) or "integrated_gradients" (zero DOS baseline).
+        attribution (GradientAttribution): Gradient attribution of the CNN model.
+        processed_dos (np.ndarray): Unoccluded DOS of shape (numSamplings, numOrbitals, 1).
+        adsorbate_dos (np.ndarray): Adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+        config (dict): Configuration dictionary.
+
+    Returns:
+        np.ndarray: Estimated prediction differences, shape (num_occlusions, numOrbitals).
+    """
+    return attribution_to_occlusion(
+        compute_attributions(method, attribution, processed_dos, adsorbate_dos, config),
+        occlusion_width=config["occlusion"]["occlusion_width"],
+        occlusion_step=config["occlusion"]["occlusion_step"],
+    )
+
+
+def run_sweep(
+    config: dict, data_loader: DataLoader, cnn_predictor: CNNPredictor
+) -> None:
+    """
+    Run occlusion experiments for every catalyst folder under the sweep root.
+
+    Results of all folders are stored in a single .npy array of shape
+    (numFolders, num_occlusions, numOrbitals), with an index.json sidecar
+    mapping each row to its folder. Completed folders are recorded in the
+    index after each folder, so an interrupted sweep resumes where it stopped.
+    Settings the results depend on are recorded too, and resuming with
+    different settings is refused.
+
+    Args:
+        config (dict): Configuration dictionary.
+        data_loader (DataLoader): Data loader.
+        cnn_predictor (CNNPredictor): CNN predictor shared across all folders.
+    """
+    if isinstance(config["occlusion"]["occlusion_width"], list):
+        raise ValueError("Sweep supports a single occlusion_width only.")
+
+    sweep_config = config["sweep"]
+    results_file = Path(sweep_config["results_file"])
+    index_file = results_file.with_suffix(".json")
+
+    # Discover catalyst folders
+    sweep_root = Path(sweep_config["root_dir"])
+    folders = find_experiment_folders(sweep_root, config["occlusion"]["dos_array_name"])
+    if not folders:
+        raise FileNotFoundError(f"No experiment folders found under {sweep_root}.")
+    keys = [str(folder.relative_to(sweep_root)) for folder in folders]
+    print(f"A total of {len(folders)} folders found.")
+
+    # Settings results depend on
+    method = config["attribution"]["method"]
+    adaptive = method == "occlusion" and config["occlusion"]["adaptive"]["enabled"]
+    settings = {
+        "method": method,
+        "occlusion_width": config["occlusion"]["occlusion_width"],
+        "occlusion_step": config["occlusion"]["occlusion_step"],
+        "adaptive": config["occlusion"]["adaptive"] if adaptive else None,
+    }
+
+    # Load index of previous run to resume
+    if index_file.exists() and results_file.exists():
+        with open(index_file, "r") as f:
+            index = json.load(f)
+        if index["keys"] != keys:
+            raise ValueError(
+                f"Folders under {sweep_root} changed since {results_file} was created, remove it to restart."
+            )
+        if index.get("settings") != settings:
+            raise ValueError(
+                f"Settings {settings} differ from {index.get('settings')} of {results_file}, remove it to restart."
+            )
+        results = np.load(results_file, mmap_mode="r+")
+    else:
+        index = {"keys": keys, "settings": settings, "completed": {}}
+        results = None
+
+    # Gradient attribution is only needed for attribution methods
+    attribution = GradientAttribution(cnn_predictor.model) if method != "occlusion" else None
+    adsorbate_dos_cache = {}
+    for row, (key, folder) in enumerate(zip(keys, folders)):
+        if key in index["completed"]:
+            continue
+        print(f"Running occlusion for {key} ({row + 1}/{len(folders)}).")
+
+        # Load adsorbate DOS matching folder name
+        _, adsorbate, _, _ = get_properties_from_path(folder)
+        if adsorbate not in adsorbate_dos_cache:
+            adsorbate_dos_cache[adsorbate] = data_loader.load_and_preprocess_adsorbate_dos(
+                get_adsorbate_dos_path(
+                    root_dir / config["sweep"]["adsorbate_dos_dir"],
+                    adsorbate,
+                    config["sweep"]["adsorbate_dos_name"],
+                ),
+                config["occlusion"]["max_adsorbate_channels"],
+            )
+
+        # Load DOS and remove ghost state
+        dos_processor = DOSProcessor(
+            data_loader.load_unshifted_dos(folder / config["occlusion"]["dos_array_name"])
+        )
+        processed_dos = dos_processor.remove_ghost_state()
+
+        generator = occlusionGenerator(
+            dos_array=processed_dos,
+            occlusion_width=config["occlusion"]["occlusion_width"],
+            occlusion_step=config["occlusion"]["occlusion_step"],
+            dos_calculation_resolution=config["occlusion"]["dos_calculation_resolution"],
+        )
+
+        # Allocate results file with first folder
+        shape = (len(folders), generator.num_occlusions, processed_dos.shape[1])
+        if results is None:
+            results = np.lib.format.open_memmap(
+                results_file, mode="w+", dtype=np.float32, shape=shape
+            )
+        elif results.shape != shape:
+            raise ValueError(
+                f"DOS in {folder} gives occlusion shape {shape[1:]}, expected {results.shape[1:]}."
+            )
+
+        if adaptive:
+            results[row] = run_adaptive_occlusion(
+                generator,
+                cnn_predictor,
+                processed_dos,
+                adsorbate_dos_cache[adsorbate],
+                config,
+            ).to_dense()
+        elif method == "occlusion":
+            results[row] = run_occlusion(
+                generator,
+                cnn_predictor,
+                processed_dos,
+                adsorbate_dos_cache[adsorbate],
+                batch_size=config["occlusion"]["batch_size"],
+                branch_cache=config["occlusion"]["branch_cache"],
+                incremental=config["occlusion"]["incremental"],
+            )
+        else:
+            results[row] = run_attribution(
+                method,
+                attribution,
+                processed_dos,
+                adsorbate_dos_cache[adsorbate],
+                config,
+            )
+        results.flush()
+
+        # Record completed folder with its Fermi level
+        try:
+            fermi_level = float(
+                get_fermi_level(
+                    working_dir=folder,
+                    fermi_level_source=root_dir / Path(config["path"]["fermi_level_source"]),
+                )
+            )
+        except (FileNotFoundError, ValueError, KeyError):
+            fermi_level = None
+        index["completed"][key] = {"row": row, "fermi_level": fermi_level}
+
+        with open(f"{index_file}.tmp", "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(f"{index_file}.tmp", index_file)
+
+    print(f"Sweep results saved to {results_file}.")
 
 
 def main():
@@ -29,6 +412,14 @@ def main():
     data_loader = DataLoader()
     config = data_loader.load_config(root_dir / "config.yaml")
 
+    # (Optional) Sweep over all catalyst folders with one shared model
+    if config["sweep"]["enabled"]:
+        cnn_model = tf.keras.models.load_model(
+            root_dir / Path(config["path"]["cnn_model_path"])
+        )
+        run_sweep(config, data_loader, CNNPredictor(loaded_model=cnn_model))
+        return
+
     adsorbate_dos = data_loader.load_and_preprocess_adsorbate_dos(
         root_dir / config["path"]["adsorbate_dos_array_path"],
         config["occlusion"]["max_adsorbate_channels"],
@@ -41,70 +432,140 @@ def main():
     dos_processor = DOSProcessor(unshifted_dos)
     processed_dos = dos_processor.remove_ghost_state()
 
-    # Step 3: Generate occlusion arrays
-    print("Generating occlusion arrays...")
-    generator = occlusionGenerator(
-        dos_array=processed_dos,
-        occlusion_width=config["occlusion"]["occlusion_width"],
-        occlusion_step=config["occlusion"]["occlusion_step"],
-        dos_calculation_resolution=config["occlusion"]["dos_calculation_resolution"],
-    )
-    occlusion_arrays = generator.generate_occlusion_arrays()
-    print("Occlusion arrays generated.")
-
-    # Step 4: Predict with CNN model
-    # Load the CNN model
+    # Step 3: Load the CNN model, shared by all occlusion widths
     cnn_model = tf.keras.models.load_model(
         root_dir / Path(config["path"]["cnn_model_path"])
     )
     # Create an instance of CNNPredictor
     cnn_predictor = CNNPredictor(loaded_model=cnn_model)
 
-    # Calculate reference point
-    ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)
+    # Reference prediction, incremental engine or attributions are computed once for all widths
+    method = config["attribution"]["method"]
+    ref_prediction, engine, attributions = None, None, None
+    if method == "occlusion":
+        if config["occlusion"]["incremental"]:
+            engine = IncrementalCNN(cnn_model, processed_dos, adsorbate_dos)
+        else:
+            ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)[0]
+    else:
+        attributions = compute_attributions(
+            method,
+            GradientAttribution(cnn_model),
+            processed_dos,
+            adsorbate_dos,
+            config,
+        )
+
+    # Read fermi level for plotting
+    fermi_level = get_fermi_level(
+        working_dir=os.getcwd(),
+        fermi_level_source=root_dir / Path(config["path"]["fermi_level_source"]),
+    )
+
+    # Step 4: Run occlusion for each width (a single width or a list of widths)
+    occlusion_widths = config["occlusion"]["occlusion_width"]
+    multi_width = isinstance(occlusion_widths, list)
+    if not multi_width:
+        occlusion_widths = [occlusion_widths]
+    save_predictions = config["occlusion"]["save_predictions"] and not multi_width
 
-    # Make prediction along each orbital
-    predictions = []
+    width_predictions = []
+    for occlusion_width in occlusion_widths:
+        if multi_width:
+            print(f"Running occlusion width {occlusion_width}.")
+        width_config = {
+            **config,
+            "occlusion": {**config["occlusion"], "occlusion_width": occlusion_width},
+        }
 
-    # Get dimensions
-    num_occlusions = occlusion_arrays.shape[0]  # Number of occlusions
-    numOrbitals = occlusion_arrays.shape[1]  # Number of orbitals
+        # Create occlusion generator (occlusion arrays generated lazily in batches)
+        generator = occlusionGenerator(
+            dos_array=processed_dos,
+            occlusion_width=occlusion_width,
+            occlusion_step=config["occlusion"]["occlusion_step"],
+            dos_calculation_resolution=config["occlusion"]["dos_calculation_resolution"],
+        )
 
-    # Initialize tqdm progress bar
-    with tqdm(total=num_occlusions * numOrbitals, desc="Making Predictions") as pbar:
-        for i in range(num_occlusions):  # Loop over the number of occlusions
-            for j in range(numOrbitals):  # Loop over each orbital
-                occluded_array = np.expand_dims(
-                    occlusion_arrays[i, j], axis=-1
-                )  # Reshape array
-                prediction = cnn_predictor.predict(
-                    occluded_array, adsorbate_dos
-                )  # Make prediction
-                predictions.append(prediction)  # Append to predictions list
-                pbar.update(1)  # Update the progress bar
+        if method == "occlusion" and config["occlusion"]["adaptive"]["enabled"]:
+            # Refine wide windows to occlusion_width only where prediction changes are large
+            adaptive = run_adaptive_occlusion(
+                generator,
+                cnn_predictor,
+                processed_dos,
+                adsorbate_dos,
+                width_config,
+                ref_prediction=ref_prediction,
+                engine=engine,
+            )
+            predictions = adaptive.to_dense()
+            if save_predictions:
+                np.savez(
+                    Path(os.getcwd()) / "adaptive_occlusion_predictions.npz",
+                    dense=predictions,
+                    **adaptive.to_sparse(),
+                )
 
-    # Reshape the predictions array to (num_occlusions, numOrbitals)
-    predictions = np.array(predictions).reshape(num_occlusions, numOrbitals)
+        elif method == "occlusion":
+            # Stream occlusion batches into CNN (optionally written to local file as they complete)
+            predictions = run_occlusion(
+                generator,
+                cnn_predictor,
+                processed_dos,
+                adsorbate_dos,
+                batch_size=config["occlusion"]["batch_size"],
+                output_file=Path(os.getcwd()) / "occlusion_predictions.npy"
+                if save_predictions
+                else None,
+                branch_cache=config["occlusion"]["branch_cache"],
+                incremental=config["occlusion"]["incremental"],
+                ref_prediction=ref_prediction,
+                engine=engine,
+            )
 
-    # Subtract ref_prediction from each prediction
-    predictions = predictions - ref_prediction
+        else:
+            # Estimate occlusion from gradient attributions (few gradient passes)
+            predictions = attribution_to_occlusion(
+                attributions,
+                occlusion_width=occlusion_width,
+                occlusion_step=config["occlusion"]["occlusion_step"],
+            )
+            if save_predictions:
+                np.save(Path(os.getcwd()) / f"{method}_predictions.npy", predictions)
 
-    # (Optional) Save predictions locally
-    if config["occlusion"]["save_predictions"]:
-        np.save(Path(os.getcwd()) / "occlusion_predictions.npy", predictions)
+        width_predictions.append(predictions)
 
-    # # (Optional) Load local predictions
-    # predictions = np.load(Path(os.getcwd()) / "occlusion_predictions.npy")
+        # # (Optional) Load local predictions
+        # predictions = np.load(Path(os.getcwd()) / "occlusion_predictions.npy")
 
-    # Step 5: Read fermi level and plot occlusion
-    fermi_level = get_fermi_level(
-        working_dir=os.getcwd(),
-        fermi_level_source=root_dir / Path(config["path"]["fermi_level_source"]),
-    )
+        # Step 5: Plot occlusion
+        plotter = OcclusionPlotter(predictions, config, fermi_level)
+        plotter.plot_heatmap(
+            orbitals=config["plotting"]["heatmap_orbitals"],
+            savename=f"occlusion_heatmap_width_{occlusion_width}.png"
+            if multi_width
+            else "occlusion_heatmap.png",
+        )
+        # plotter.plot_line(orbitals=config['plotting']['line_orbitals'])
+
+    # Save all widths into one labelled (width, window, orbital) array, NaN-padded
+    # as wider windows give fewer occlusions
+    if multi_width and config["occlusion"]["save_predictions"]:
+        num_occlusions = np.array([len(i) for i in width_predictions])
+        stacked = np.full(
+            (len(width_predictions), num_occlusions.max(), processed_dos.shape[1]),
+            np.nan,
+            dtype=np.float32,
+        )
+        for i, predictions in enumerate(width_predictions):
+            stacked[i, : len(predictions)] = predictions
 
-    plotter = OcclusionPlotter(predictions, config, fermi_level)
-    plotter.plot_heatmap(orbitals=config["plotting"]["heatmap_orbitals"])
-    # plotter.plot_line(orbitals=config['plotting']['line_orbitals'])
+        np.savez(
+            Path(os.getcwd()) / f"{method}_predictions_multi_width.npz",
+            predictions=stacked,
+            occlusion_widths=np.array(occlusion_widths),
+            num_occlusions=num_occlusions,
+            occlusion_step=config["occlusion"]["occlusion_step"],
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+"""Adaptive coarse-to-fine occlusion."""
+
+
+import numpy as np
+from typing import Callable, Dict
+
+
+class AdaptiveOcclusion:
+    """
+    Class for coarse-to-fine occlusion, refining only the sensitive windows.
+
+    The energy axis is first tiled with wide contiguous windows. At each level,
+    windows with |ΔE_ads| above a threshold (or with |ΔE_ads| per sampling in
+    the top fraction of the coarsest windows) are split into narrower windows,
+    until occlusion_width is reached. Windows that are not refined are kept as leaves.
+
+    Attributes:
+        numSamplings (int): Number of samplings of the DOS.
+        numOrbitals (int): Number of orbitals of the DOS.
+        occlusion_width (int): Width of the finest occlusion windows.
+        occlusion_step (int): Step of the uniform occlusion map the result is rendered to.
+        initial_width (int): Width of the coarsest occlusion windows.
+        split_factor (int): Number of child windows per refined window.
+        threshold (float): Windows with |ΔE_ads| above threshold (eV) are refined.
+        top_fraction (float): Fraction of the coarsest windows (by |ΔE_ads| per sampling) refined,
+            finer windows are refined at the same |ΔE_ads| per sampling.
+        leaves (dict): Leaf windows of each orbital, in {orbital_index: (lo, hi, predictions)}.
+        num_predictions (int): Number of occluded predictions made.
+    """
+
+    def __init__(
+        self,
+        numSamplings: int,
+        numOrbitals: int,
+        occlusion_width: int,
+        occlusion_step: int,
+        initial_width: int,
+        split_factor: int = 4,
+        threshold: float = None,
+        top_fraction: float = None,
+    ) -> None:
+        """
+        Initialize the AdaptiveOcclusion.
+
+        Args:
+            numSamplings (int): Number of samplings of the DOS.
+            numOrbitals (int): Number of orbitals of the DOS.
+            occlusion_width (int): Width of the finest occlusion windows.
+            occlusion_step (int): Step of the uniform occlusion map the result is rendered to.
+            initial_width (int): Width of the coarsest occlusion windows.
+            split_factor (int, optional): Number of child windows per refined window. Defaults to 4.
+            threshold (float, optional): Refine windows with |ΔE_ads| above threshold (eV). Defaults to None.
+            top_fraction (float, optional): Refine the top fraction of coarsest windows by |ΔE_ads| per sampling,
+                and finer windows at the same |ΔE_ads| per sampling. Defaults to None.
+
+        Raises:
+            ValueError: When input values are not as expected.
+        """
+        if not isinstance(occlusion_width, int) or occlusion_width < 1:
+            raise ValueError("Occlusion width must be a positive integer.")
+        if not isinstance(occlusion_step, int) or occlusion_step < 1:
+            raise ValueError("Occlusion step must be a positive integer.")
+        if not isinstance(initial_width, int) or not occlusion_width <= initial_width <= numSamplings:
+            raise ValueError("Initial width must be an integer between occlusion_width and numSamplings.")
+        if not isinstance(split_factor, int) or split_factor < 2:
+            raise ValueError("Split factor must be an integer greater than 1.")
+        if threshold is None and top_fraction is None:
+            raise ValueError("At least one of threshold and top_fraction should be given.")
+        if threshold is not None and threshold < 0:
+            raise ValueError("Threshold must be non-negative.")
+        if top_fraction is not None and not 0 <= top_fraction <= 1:
+            raise ValueError("Top fraction must be within [0, 1].")
+
+        self.numSamplings = numSamplings
+        self.numOrbitals = numOrbitals
+        self.occlusion_width = occlusion_width
+        self.occlusion_step = occlusion_step
+        self.initial_width = initial_width
+        self.split_factor = split_factor
+        self.threshold = threshold
+        self.top_fraction = top_fraction
+
+        self.leaves: Dict[int, tuple] = {}
+        self.num_predictions = 0
+
+    def _select(self, widths: np.ndarray, predictions: np.ndarray, density_threshold: float) -> np.ndarray:
+        """
+        Select windows to be refined.
+
+        Args:
+            widths (np.ndarray): Widths of candidate windows.
+            predictions (np.ndarray): Prediction differences of candidate windows.
+            density_threshold (float): Refine windows with |ΔE_ads| per sampling at or above it (top_fraction criterion).
+
+        Returns:
+            np.ndarray: Boolean mask of windows to be refined.
+        """
+        magnitudes = np.abs(predictions)
+
+        selected = np.zeros(len(widths), dtype=bool)
+        if self.threshold is not None:
+            selected |= magnitudes > self.threshold
+        if self.top_fraction is not None:
+            selected |= (magnitudes > 0) & (magnitudes / widths >= density_threshold)
+
+        return selected & (widths > self.occlusion_width)
+
+    @staticmethod
+    def _split(lo: np.ndarray, hi: np.ndarray, width: int):
+        """
+        Split windows [lo, hi) into contiguous child windows of given width (last one may be narrower).
+
+        Returns:
+            tuple: Lower (inclusive) and upper (exclusive) sampling indices of child windows.
+        """
+        num_children = -(-(hi - lo) // width)
+        parents = np.repeat(np.arange(len(lo)), num_children)
+        offsets = np.arange(len(parents)) - np.repeat(np.cumsum(num_children) - num_children, num_children)
+
+        child_lo = lo[parents] + offsets * width
+        return child_lo, np.minimum(child_lo + width, hi[parents])
+
+    def refine(self, predict_windows: Callable[[int, np.ndarray, np.ndarray], np.ndarray]) -> "AdaptiveOcclusion":
+        """
+        Run coarse-to-fine refinement.
+
+        Args:
+            predict_windows (callable): Function (orbital_index, lo, hi) -> prediction differences
+                of the DOS with samplings [lo, hi) of the orbital occluded, one per window.
+
+        Returns:
+            AdaptiveOcclusion: self, with leaves and num_predictions updated.
+        """
+        self.num_predictions = 0
+        leaves = {i: [] for i in range(self.numOrbitals)}
+
+        # Coarsest level tiles the whole energy axis
+        lo, hi = self._split(np.array([0]), np.array([self.numSamplings]), self.initial_width)
+        windows = {i: (lo, hi) for i in range(self.numOrbitals)}
+        width = self.initial_width
+        density_threshold = None
+
+        while windows:
+            # Predict all windows of current level
+            predictions = {}
+            for orbital_index, (lo, hi) in windows.items():
+                predictions[orbital_index] = np.asarray(predict_windows(orbital_index, lo, hi))
+                self.num_predictions += len(lo)
+
+            # Select windows to refine across all orbitals
+            orbital_order = list(windows)
+            widths = np.concatenate([windows[i][1] - windows[i][0] for i in orbital_order])
+            level_predictions = np.concatenate([predictions[i] for i in orbital_order])
+
+            # Top fraction is set by |ΔE_ads| per sampling of the coarsest windows,
+            # so children of sensitive windows keep being refined at finer levels
+            if density_threshold is None and self.top_fraction is not None:
+                density_threshold = np.quantile(np.abs(level_predictions) / widths, 1 - self.top_fraction)
+
+            selected = np.split(
+                self._select(widths, level_predictions, density_threshold),
+                np.cumsum([len(windows[i][0]) for i in orbital_order])[:-1],
+            )
+
+            # Keep unselected windows as leaves, and split selected ones
+            width = max(self.occlusion_width, -(-width // self.split_factor))
+            next_windows = {}
+            for orbital_index, mask in zip(orbital_order, selected):
+                lo, hi = windows[orbital_index]
+                leaves[orbital_index].append((lo[~mask], hi[~mask], predictions[orbital_index][~mask]))
+                if np.any(mask):
+                    next_windows[orbital_index] = self._split(lo[mask], hi[mask], width)
+            windows = next_windows
+
+        self.leaves = {
+            i: tuple(np.concatenate(arrays) for arrays in zip(*levels))
+            for i, levels in leaves.items()
+        }
+
+        return self
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Render leaves to the uniform occlusion map.
+
+        Each uniform window (centred at i * occlusion_step) takes the prediction
+        of the leaf containing its centre, scaled by occlusion_width / leaf width,
+        i.e. assuming the effect is spread evenly over the leaf.
+
+        Returns:
+            np.ndarray: Prediction differences of shape (num_occlusions, numOrbitals), compatible with OcclusionPlotter.
+        """
+        if not self.leaves:
+            raise RuntimeError("Run refine before rendering the occlusion map.")
+
+        num_occlusions = (self.numSamplings - self.occlusion_width) // self.occlusion_step + 1
+        centres = np.arange(num_occlusions) * self.occlusion_step
+
+        dense = np.empty((num_occlusions, self.numOrbitals), dtype=np.float32)
+        for orbital_index, (lo, hi, predictions) in self.leaves.items():
+            order = np.argsort(lo)
+            leaf = order[np.searchsorted(lo[order], centres, side="right") - 1]
+            dense[:, orbital_index] = predictions[leaf] * self.occlusion_width / (hi[leaf] - lo[leaf])
+
+        return dense
+
+    def to_sparse(self) -> Dict[str, np.ndarray]:
+        """
+        Export leaves as flat arrays.
+
+        Returns:
+            dict: Arrays "orbital", "lo", "hi" and "predictions" of all leaf windows.
+        """
+        orbitals = list(self.leaves)
+
+        return {
+            "orbital": np.concatenate([np.full(len(self.leaves[i][0]), i) for i in orbitals]),
+            "lo": np.concatenate([self.leaves[i][0] for i in orbitals]),
+            "hi": np.concatenate([self.leaves[i][1] for i in orbitals]),
+            "predictions": np.concatenate([self.leaves[i][2] for i in orbitals]),
+        }
@@ -0,0 +1,148 @@
+"""Gradient-based attribution maps as a fast alternative to occlusion."""
+
+
+import numpy as np
+import tensorflow as tf
+
+
+class GradientAttribution:
+    """
+    Class for computing gradient attributions of the CNN prediction to the DOS.
+
+    Attributes:
+        model (tf.keras.Model): The trained CNN model.
+    """
+
+    def __init__(self, model: tf.keras.Model) -> None:
+        """
+        Initialize the GradientAttribution.
+
+        Args:
+            model (tf.keras.Model): The trained CNN model.
+        """
+        self.model = model
+
+    @tf.function(reduce_retracing=True)
+    def _gradients(self, dos_arrays: tf.Tensor, adsorbate_dos: tf.Tensor) -> tf.Tensor:
+        """
+        Compute gradients of predictions to DOS arrays in one tape pass.
+
+        Args:
+            dos_arrays (tf.Tensor): DOS arrays of shape (N, numSamplings, numOrbitals, 1).
+            adsorbate_dos (tf.Tensor): The adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+
+        Returns:
+            tf.Tensor: Gradients of shape (N, numSamplings, numOrbitals).
+        """
+        adsorbate_dos = tf.broadcast_to(
+            adsorbate_dos,
+            tf.concat([tf.shape(dos_arrays)[:1], tf.shape(adsorbate_dos)], axis=0),
+        )
+
+        with tf.GradientTape() as tape:
+            tape.watch(dos_arrays)
+            predictions = self.model(
+                tf.concat([dos_arrays, adsorbate_dos], axis=-1), training=False
+            )
+
+        # Gradient of non-scalar target is taken on its sum, which gives
+        # per-sample gradients as samples are independent
+        return tape.gradient(predictions, dos_arrays)[..., 0]
+
+    def saliency(self, dos_array: np.ndarray, adsorbate_dos: np.ndarray) -> np.ndarray:
+        """
+        Compute gradient of the prediction to each energy point and orbital.
+
+        Args:
+            dos_array (np.ndarray): The DOS array of shape (numSamplings, numOrbitals, 1).
+            adsorbate_dos (np.ndarray): The adsorbate DOS array of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+
+        Returns:
+            np.ndarray: d(E_ads)/d(DOS) of shape (numSamplings, numOrbitals).
+        """
+        dos_arrays = tf.constant(dos_array[np.newaxis], dtype=tf.float32)
+
+        return self._gradients(
+            dos_arrays, tf.constant(adsorbate_dos, dtype=tf.float32)
+        ).numpy()[0]
+
+    def integrated_gradients(
+        self,
+        dos_array: np.ndarray,
+        adsorbate_dos: np.ndarray,
+        baseline: np.ndarray = None,
+        num_steps: int = 64,
+        batch_size: int = 64,
+    ) -> np.ndarray:
+        """
+        Compute integrated gradients along a straight path from baseline to DOS.
+
+        Attributions sum up to approximately prediction(DOS) - prediction(baseline).
+
+        Args:
+            dos_array (np.ndarray): The DOS array of shape (numSamplings, numOrbitals, 1).
+            adsorbate_dos (np.ndarray): The adsorbate DOS array of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+            baseline (np.ndarray, optional): The baseline DOS array. Defaults to zero DOS.
+            num_steps (int, optional): Number of trapezoidal integration steps. Defaults to 64.
+            batch_size (int, optional): Number of path points per gradient pass. Defaults to 64.
+
+        Returns:
+            np.ndarray: Attributions of shape (numSamplings, numOrbitals).
+        """
+        if not isinstance(num_steps, int) or num_steps < 1:
+            raise ValueError("Number of integration steps must be a positive integer.")
+        if baseline is None:
+            baseline = np.zeros_like(dos_array)
+
+        # Path points between baseline and DOS (trapezoidal weights)
+        alphas = np.linspace(0.0, 1.0, num_steps + 1)
+        weights = np.full(num_steps + 1, 1.0 / num_steps)
+        weights[[0, -1]] /= 2
+
+        adsorbate_dos = tf.constant(adsorbate_dos, dtype=tf.float32)
+        avg_gradients = np.zeros(dos_array.shape[:2])
+        for start in range(0, len(alphas), batch_size):
+            batch_alphas = alphas[start : start + batch_size, np.newaxis, np.newaxis, np.newaxis]
+            path_arrays = baseline + batch_alphas * (dos_array - baseline)
+
+            gradients = self._gradients(
+                tf.constant(path_arrays, dtype=tf.float32), adsorbate_dos
+            ).numpy()
+            avg_gradients += np.tensordot(weights[start : start + batch_size], gradients, axes=1)
+
+        return (dos_array - baseline)[..., 0] * avg_gradients
+
+
+def attribution_to_occlusion(
+    attributions: np.ndarray, occlusion_width: int, occlusion_step: int
+) -> np.ndarray:
+    """
+    Convert attributions to first-order estimates of occlusion predictions.
+
+    Occluding (zeroing) a window removes the attributions inside it, so the
+    estimated prediction change is minus the attribution sum over the window.
+    Windows follow the centered convention of occlusionGenerator.
+
+    Args:
+        attributions (np.ndarray): Attributions of shape (numSamplings, numOrbitals).
+        occlusion_width (int): The width of the occlusion window (odd).
+        occlusion_step (int): The step size for moving the occlusion window.
+
+    Returns:
+        np.ndarray: Estimated prediction changes of shape (num_occlusions, numOrbitals),
+        compatible with OcclusionPlotter.
+    """
+    numSamplings = attributions.shape[0]
+    pad_width = (occlusion_width - 1) // 2
+    num_occlusions = (numSamplings - occlusion_width) // occlusion_step + 1
+
+    centres = np.arange(num_occlusions) * occlusion_step
+    lo = np.maximum(centres - pad_width, 0)
+    hi = np.minimum(centres + pad_width + 1, numSamplings)
+
+    # Window sums from cumulative sums
+    cumsum = np.concatenate(
+        [np.zeros((1, attributions.shape[1])), np.cumsum(attributions, axis=0)]
+    )
+
+    return -(cumsum[hi] - cumsum[lo])
@@ -2,6 +2,7 @@
 
 
 import numpy as np
+from typing import Iterator, Tuple
 import warnings
 
 
@@ -61,61 +62,64 @@ class occlusionGenerator:
         self.occlusion_width = occlusion_width
         self.occlusion_step = occlusion_step
 
-    def _apply_padding(self, array: np.ndarray, mode: str) -> np.ndarray:
-        """Applies zero-padding or cropping to the input array.
+    @property
+    def num_occlusions(self) -> int:
+        """Total number of occlusion windows along the energy axis."""
+        return (
+            (self.dos_array.shape[0] - self.occlusion_width) // self.occlusion_step
+        ) + 1
+
+    def _window_bounds(self, window_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute occluded sampling ranges [lo, hi) for given occlusion windows.
+
+        Windows are centered, i.e. window i zeroes samplings
+        [i * step - pad_width, i * step + pad_width] clipped to the DOS range,
+        with pad_width = (occlusion_width - 1) / 2.
 
         Args:
-            array (np.ndarray): The input array to be padded or cropped.
-            mode (str): Either "pad" for zero-padding or "crop" for cropping.
+            window_indices (np.ndarray): Indices of occlusion windows.
 
         Returns:
-            np.ndarray: The zero-padded or cropped array.
+            tuple: Lower (inclusive) and upper (exclusive) sampling indices.
         """
-        pad_width = (self.occlusion_width - 1) / 2
-        if not pad_width.is_integer():
-            raise ValueError(
-                "pad_width must be an integer. Please choose an odd integer for occlusion_width."
-            )
-
-        pad_width = int(pad_width)
-        if pad_width == 0:
-            return array
-
-        if mode == "pad":
-            return np.pad(array, ((pad_width, pad_width), (0, 0)), mode="constant")
+        pad_width = (self.occlusion_width - 1) // 2
+        centres = np.asarray(window_indices) * self.occlusion_step
 
-        elif mode == "crop":
-            return array[pad_width:-pad_width, :]
+        lo = np.maximum(centres - pad_width, 0)
+        hi = np.minimum(centres + pad_width + 1, self.dos_array.shape[0])
 
-        else:
-            raise ValueError("Mode should be either 'pad' or 'crop'.")
+        return lo, hi
 
-    def _occlude(
-        self, dos: np.ndarray, orbital_index: int, start_index: int, width: int
+    def _occlude_windows(
+        self, orbital_indices: np.ndarray, lo: np.ndarray, hi: np.ndarray
     ) -> np.ndarray:
         """
-        Occlude a region in a given DOS array along a specified orbital.
+        Occlude one window per output array via index masks.
 
         Args:
-            dos (np.ndarray): The original DOS array.
-            orbital_index (int): The index of the orbital to be occluded.
-            start_index (int): The starting index for the occlusion.
-            width (int): The width of the occlusion region.
+            orbital_indices (np.ndarray): Orbital to be occluded for each array, shape (N, ).
+            lo (np.ndarray): Lower (inclusive) sampling index of each window, shape (N, ).
+            hi (np.ndarray): Upper (exclusive) sampling index of each window, shape (N, ).
 
         Returns:
-            np.ndarray: The occluded DOS array, maintaining the same shape as the original DOS array.
+            np.ndarray: Occluded DOS arrays of shape (N, numSamplings, numOrbitals).
         """
-        # Zero-padding the DOS array
-        padded_dos = self._apply_padding(np.copy(dos), "pad")
+        orbital_indices = np.asarray(orbital_indices)
+        numSamplings = self.dos_array.shape[0]
 
-        # Occlude the DOS array
-        padded_dos[start_index : start_index + width, orbital_index] = 0.0
+        occluded_arrays = np.repeat(self.dos_array[np.newaxis], len(orbital_indices), axis=0)
 
-        # Crop the DOS array to its original shape
-        cropped_occluded_dos = self._apply_padding(padded_dos, "crop")
+        # Mask of occluded samplings for each array, shape (N, numSamplings)
+        samplings = np.arange(numSamplings)
+        mask = (samplings >= np.asarray(lo)[:, np.newaxis]) & (
+            samplings < np.asarray(hi)[:, np.newaxis]
+        )
 
-        assert dos.shape == cropped_occluded_dos.shape
-        return cropped_occluded_dos
+        array_idx, sampling_idx = np.nonzero(mask)
+        occluded_arrays[array_idx, sampling_idx, orbital_indices[array_idx]] = 0.0
+
+        return occluded_arrays
 
     def generate_occlusion_arrays(self) -> np.ndarray:
         """
@@ -125,29 +129,66 @@ class occlusionGenerator:
         Returns:
             np.ndarray: An array of shape (num_occlusions, numOrbitals), each
             element hosting an occluded_array of shape (numSamplings, numOrbitals)
+
+        Notes:
+            This materializes all occlusion arrays at once, use
+            iter_occlusion_batches for large numbers of occlusions.
         """
-        numSamplings, numOrbitals = self.dos_array.shape
+        numOrbitals = self.dos_array.shape[1]
 
-        # Calculate and check total number of occlusions
-        num_occlusions = (
-            (numSamplings - self.occlusion_width) // self.occlusion_step
-        ) + 1
-        if not float(num_occlusions).is_integer():
-            raise ValueError(
-                f"The resultant number of occlusions must be an integer. Current value is {num_occlusions}."
-            )
+        window_indices = np.repeat(np.arange(self.num_occlusions), numOrbitals)
+        orbital_indices = np.tile(np.arange(numOrbitals), self.num_occlusions)
+        lo, hi = self._window_bounds(window_indices)
+
+        occlusion_arrays = self._occlude_windows(orbital_indices, lo, hi)
 
-        # Initialize a list to store the occlusion arrays
-        occlusion_arrays = []
+        return occlusion_arrays.reshape(
+            self.num_occlusions, numOrbitals, *self.dos_array.shape
+        )
 
-        for occlusion_test_index in range(num_occlusions):
-            occluded_orbitals = []
-            for orbital_index in range(numOrbitals):
-                start_index = occlusion_test_index * self.occlusion_step
-                occluded_array = self._occlude(
-                    self.dos_array, orbital_index, start_index, self.occlusion_width
+    def iter_occlusion_windows(
+        self, batch_size: int
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Lazily generate batches of occlusion windows, orbital by orbital, without occluded arrays.
+
+        Args:
+            batch_size (int): Maximum number of occlusion windows per batch.
+
+        Yields:
+            tuple: (orbital_index, window_indices, lo, hi), where [lo, hi) are the
+            occluded sampling ranges of the windows.
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("Batch size must be a positive integer.")
+
+        for orbital_index in range(self.dos_array.shape[1]):
+            for start in range(0, self.num_occlusions, batch_size):
+                window_indices = np.arange(
+                    start, min(start + batch_size, self.num_occlusions)
                 )
-                occluded_orbitals.append(occluded_array)
-            occlusion_arrays.append(np.array(occluded_orbitals))
+                lo, hi = self._window_bounds(window_indices)
+
+                yield orbital_index, window_indices, lo, hi
+
+    def iter_occlusion_batches(
+        self, batch_size: int
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """
+        Lazily generate batches of occlusion arrays, orbital by orbital.
+
+        Args:
+            batch_size (int): Maximum number of occlusion arrays per batch.
+
+        Yields:
+            tuple: (orbital_index, window_indices, occluded_arrays), where occluded_arrays
+            is of shape (len(window_indices), numSamplings, numOrbitals, 1).
+        """
+        for orbital_index, window_indices, lo, hi in self.iter_occlusion_windows(
+            batch_size
+        ):
+            occluded_arrays = self._occlude_windows(
+                np.full(len(window_indices), orbital_index), lo, hi
+            )
 
-        return np.array(occlusion_arrays)
+            yield orbital_index, window_indices, occluded_arrays[..., np.newaxis]
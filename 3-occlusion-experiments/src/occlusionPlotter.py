@@ -113,6 +113,7 @@ class OcclusionPlotter:
         orbitals: list = ["s", "p", "d"],
         colormap: str = "viridis",
         show: bool = False,
+        savename: str = "occlusion_heatmap.png",
     ) -> None:
         """
         Plot the heatmap for occlusion predictions.
@@ -121,6 +122,7 @@ class OcclusionPlotter:
             orbitals (list, optional): List of orbitals to consider. Defaults to ["s", "p", "d"].
             colormap (str, optional): The colormap for the heatmap. Defaults to "viridis".
             show (bool, optional): Whether to show the plot or not. Defaults to False.
+            savename (str, optional): File name of the figure, saved in working directory. Defaults to "occlusion_heatmap.png".
         """
         # Load predictions
         predictions = self.predictions
@@ -223,9 +225,10 @@ class OcclusionPlotter:
         cb.update_ticks()
 
         # Save figure and (optionally show figure)
-        plt.savefig(Path(os.getcwd()) / "occlusion_heatmap.png", dpi=300)
+        plt.savefig(Path(os.getcwd()) / savename, dpi=300)
         if show:
             plt.show()
+        plt.close(fig)
 
     def plot_line(self, orbitals: list = ["s", "p", "d"], show: bool = False) -> None:
         """Plot DOS line charts for specified orbitals.
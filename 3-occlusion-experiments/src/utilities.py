@@ -3,7 +3,7 @@
 
 import pandas as pd
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
 
 def get_properties_from_path(working_dir: Path) -> Tuple[str, str, str, str]:
@@ -64,3 +64,50 @@ def get_fermi_level(working_dir: str, fermi_level_source: str) -> float:
     original_column_name = df.columns[adsorbate_columns.index(adsorbate)]
 
     return df.loc[metal, original_column_name]
+
+
+def find_experiment_folders(root_dir: str, dos_array_name: str) -> List[Path]:
+    """
+    Find all folders in {substrate}_{adsorbate}_{state}/{metal} format holding a DOS array.
+
+    Parameters:
+        root_dir (str): The directory to search recursively.
+        dos_array_name (str): The DOS array file name, e.g. "dos_up.npy".
+
+    Returns:
+        list: Sorted list of matching folder paths.
+    """
+    folders = []
+    for dos_file in Path(root_dir).rglob(dos_array_name):
+        try:
+            get_properties_from_path(dos_file.parent)
+        except ValueError:
+            continue
+        folders.append(dos_file.parent)
+
+    return sorted(folders)
+
+
+def get_adsorbate_dos_path(
+    adsorbate_dos_dir: str, adsorbate: str, adsorbate_dos_name: str
+) -> Path:
+    """
+    Get adsorbate DOS file from a directory of "{index}-{adsorbate}" folders.
+
+    Parameters:
+        adsorbate_dos_dir (str): The directory holding adsorbate DOS folders, e.g. "3-CO".
+        adsorbate (str): The adsorbate name, e.g. "CO".
+        adsorbate_dos_name (str): The adsorbate DOS file name, e.g. "dos_up_adsorbate.npy".
+
+    Returns:
+        Path: The adsorbate DOS file path.
+    """
+    adsorbate_dos_dir = Path(adsorbate_dos_dir)
+
+    for folder in sorted(adsorbate_dos_dir.iterdir()):
+        if folder.is_dir() and folder.name.split("-")[-1] == adsorbate:
+            return folder / adsorbate_dos_name
+
+    raise FileNotFoundError(
+        f"Adsorbate DOS folder for {adsorbate} not found in {adsorbate_dos_dir}."
+    )
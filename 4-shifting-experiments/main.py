@@ -1,6 +1,8 @@
 """eDOS shifting experiment main."""
 
 
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
 from pathlib import Path
 import numpy as np
@@ -8,8 +10,9 @@ import tensorflow as tf
 from tqdm import tqdm
 import sys
 
-from src.shiftGenerator import ShiftGenerator
+from src.shiftGenerator import ShiftGenerator, ShiftGridGenerator
 from src.shiftPlotter import ShiftPlotter
+from src.shiftSensitivity import ShiftSensitivity
 from src.utilities import get_folders_in_dir
 
 sys.path.append("../shared_components/src")
@@ -18,6 +21,205 @@ from dataLoader import DataLoader
 from dosProcessor import DOSProcessor
 
 
+def load_and_shift(
+    folder: Path, config: dict, data_loader: DataLoader, generate_shifts: bool = True
+):
+    """
+    Load the DOS of a folder and generate its shifted arrays.
+
+    Args:
+        folder (Path): Folder containing the DOS array.
+        config (dict): Configuration dictionary.
+        data_loader (DataLoader): Data loader.
+        generate_shifts (bool, optional): Generate shifted arrays. Defaults to True.
+
+    Returns:
+        tuple: Processed DOS of shape (numSamplings, numOrbitals, 1), shifted DOS
+        arrays of shape (numShifts, numSamplings, numOrbitals, 1) (None if not generated)
+        and shift values.
+    """
+    # Load DOS array with DOSProcessor
+    unshifted_dos = data_loader.load_unshifted_dos(
+        folder / config["shifting"]["dos_array_name"]
+    )
+    dos_processor = DOSProcessor(unshifted_dos)
+    processed_dos = dos_processor.remove_ghost_state()
+
+    # Generate shifting arrays with ShiftGenerator
+    shift_gen = ShiftGenerator(
+        processed_dos,
+        dos_calculation_resolution=config["shifting"]["dos_calculation_resolution"],
+        shifting_range=config["shifting"]["shifting_range"],
+        shifting_step=config["shifting"]["shifting_step"],
+        shifting_orbitals=config["shifting"]["shifting_orbitals"],
+    )
+
+    shifted_dos_arrays = shift_gen.generate_shifted_arrays() if generate_shifts else None
+
+    return processed_dos, shifted_dos_arrays, shift_gen.shift_values
+
+
+def result_settings(config: dict, grid: bool = False) -> dict:
+    """
+    Collect the config values shifting results depend on.
+
+    Args:
+        config (dict): Configuration dictionary.
+        grid (bool, optional): Settings of N-D grid results instead of 1-D shifting. Defaults to False.
+
+    Returns:
+        dict: Settings to store next to (and compare with) each result.
+    """
+    settings = {
+        key: config["path"][key] for key in ("cnn_model_path", "adsorbate_dos_array_path")
+    }
+    settings.update(
+        {
+            key: config["shifting"][key]
+            for key in (
+                "dos_array_name",
+                "dos_calculation_resolution",
+                "max_adsorbate_channels",
+                "remove_ghost_state",
+            )
+        }
+    )
+
+    if grid:
+        settings.update(
+            {
+                key: config["grid"][key]
+                for key in ("orbital_groups", "shifting_ranges", "shifting_steps")
+            }
+        )
+    else:
+        settings.update(
+            {
+                key: config["shifting"][key]
+                for key in ("shifting_range", "shifting_step", "shifting_orbitals")
+            }
+        )
+
+    return settings
+
+
+def has_result(prediction_file: Path, settings: dict) -> bool:
+    """
+    Check if a result exists and was made with the same settings.
+
+    Settings are stored as JSON next to the result, "{stem}.json".
+
+    Args:
+        prediction_file (Path): Result file.
+        settings (dict): Settings of the current run, see result_settings.
+
+    Returns:
+        bool: True if the result can be reused.
+    """
+    settings_file = prediction_file.with_suffix(".json")
+    if not (prediction_file.exists() and settings_file.exists()):
+        return False
+
+    with open(settings_file, "r") as f:
+        if json.load(f) == settings:
+            return True
+
+    print(f"Settings of {prediction_file} differ, recomputing.")
+    return False
+
+
+def save_settings(prediction_file: Path, settings: dict) -> None:
+    """Store settings next to a result, see has_result."""
+    with open(prediction_file.with_suffix(".json"), "w") as f:
+        json.dump(settings, f, indent=2)
+
+
+def run_grid(
+    folders: list,
+    config: dict,
+    data_loader: DataLoader,
+    adsorbate_dos: np.ndarray,
+    prediction_save_dir: Path,
+) -> None:
+    """
+    Run N-D shifting grid experiments, one grid axis per orbital group.
+
+    Predictions of each folder are saved as "grid_predictions.npz" holding
+    "predictions" of the grid shape, and "shift_values_{axis}" and
+    "orbitals_{axis}" labelling each grid axis.
+
+    Args:
+        folders (list): Folders containing the DOS array.
+        config (dict): Configuration dictionary.
+        data_loader (DataLoader): Data loader.
+        adsorbate_dos (np.ndarray): Adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+        prediction_save_dir (Path): Directory to save predictions of each folder.
+    """
+    grid_config = config["grid"]
+
+    # Skip folders with results for the same settings
+    settings = result_settings(config, grid=True)
+    pending_folders = [
+        folder
+        for folder in folders
+        if not has_result(prediction_save_dir / folder.name / "grid_predictions.npz", settings)
+    ]
+    print(
+        f"{len(folders)} folders found, {len(folders) - len(pending_folders)} with existing results skipped."
+    )
+    if not pending_folders:
+        return
+
+    cnn_model = tf.keras.models.load_model(Path(config["path"]["cnn_model_path"]))
+    cnn_predictor = CNNPredictor(loaded_model=cnn_model)
+
+    for folder in tqdm(pending_folders, desc="Processing folders"):
+        unshifted_dos = data_loader.load_unshifted_dos(
+            folder / config["shifting"]["dos_array_name"]
+        )
+        processed_dos = DOSProcessor(unshifted_dos).remove_ghost_state()
+
+        grid_gen = ShiftGridGenerator(
+            processed_dos,
+            orbital_groups=grid_config["orbital_groups"],
+            shifting_ranges=grid_config["shifting_ranges"],
+            shifting_steps=grid_config["shifting_steps"],
+            dos_calculation_resolution=config["shifting"]["dos_calculation_resolution"],
+        )
+
+        # Predict over the flattened grid in batches
+        ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)[0]
+        predictions = np.empty(int(np.prod(grid_gen.grid_shape)), dtype=np.float32)
+        for flat_indices, shifted_arrays in grid_gen.iter_shifted_batches(
+            config["shifting"]["batch_size"]
+        ):
+            predictions[flat_indices] = cnn_predictor.predict_batch(
+                shifted_arrays,
+                adsorbate_dos,
+                batch_size=config["shifting"]["batch_size"],
+                perturbed_orbitals=sorted(set().union(*grid_gen.orbital_groups))
+                if config["shifting"]["branch_cache"]
+                else None,
+            )
+
+        # Save labelled grid predictions
+        labels = {}
+        for axis, (shift_values, group) in enumerate(
+            zip(grid_gen.axis_shift_values, grid_gen.orbital_groups)
+        ):
+            labels[f"shift_values_{axis}"] = shift_values
+            labels[f"orbitals_{axis}"] = np.array(group)
+
+        prediction_save_path = prediction_save_dir / folder.name
+        prediction_save_path.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            prediction_save_path / "grid_predictions.npz",
+            predictions=predictions.reshape(grid_gen.grid_shape) - ref_prediction,
+            **labels,
+        )
+        save_settings(prediction_save_path / "grid_predictions.npz", settings)
+
+
 def main():
     # Step 1: Load config and adsorbate DOS
     data_loader = DataLoader()
@@ -34,65 +236,129 @@ def main():
         working_dir, filter_file=config["shifting"]["dos_array_name"]
     )
 
-    # Load the CNN model
-    cnn_model = tf.keras.models.load_model(Path(config["path"]["cnn_model_path"]))
-
-    # Create an instance of CNNPredictor
-    cnn_predictor = CNNPredictor(loaded_model=cnn_model)
-
     # Create an empty list to store predictions for future plotting
     all_predictions = {}
     prediction_save_base = Path(config["path"]["prediction_saving_path"])
 
-    # Step 3: Loop through each folder
-    for i, folder in enumerate(tqdm(folders, desc="Processing folders")):
-        print(f"Processing folder {folder.name} ({i + 1} out of {len(folders)})...")
-        dos_file_path = folder / config["shifting"]["dos_array_name"]
+    # (Optional) Run N-D shifting grid over orbital groups instead
+    if config["grid"]["enabled"]:
+        run_grid(
+            folders,
+            config,
+            data_loader,
+            adsorbate_dos,
+            prediction_save_dir=prediction_save_base
+            / Path(working_dir).name
+            / f"grid-orbital_groups_{config['grid']['orbital_groups']}-shifting_ranges_{config['grid']['shifting_ranges']}-shifting_steps_{config['grid']['shifting_steps']}",
+        )
+        return
 
-        # a. Load DOS array with DOSProcessor
-        unshifted_dos = data_loader.load_unshifted_dos(dos_file_path)
-        dos_processor = DOSProcessor(unshifted_dos)
-        processed_dos = dos_processor.remove_ghost_state()
+    # Create a specific save path for each folder's predictions (keyed by shifting parameters)
+    prediction_save_dir = (
+        prediction_save_base
+        / Path(working_dir).name
+        / f"shifting_range_{config['shifting']['shifting_range']}-shifting_step_{config['shifting']['shifting_step']}-orbital_{config['shifting']['shifting_orbitals']}"
+    )
 
-        # b. Generate shifting arrays with ShiftGenerator
-        shift_gen = ShiftGenerator(
-            processed_dos,
-            dos_calculation_resolution=config["shifting"]["dos_calculation_resolution"],
-            shifting_range=config["shifting"]["shifting_range"],
-            shifting_step=config["shifting"]["shifting_step"],
+    # Brute-force prediction at every shift, or Taylor estimate from shift derivatives
+    method = config["shifting"]["method"]
+    if method not in {"brute_force", "taylor"}:
+        raise ValueError("Shifting method should be either brute_force or taylor.")
+    prediction_file_name = (
+        "predictions.npy" if method == "brute_force" else "taylor_predictions.npy"
+    )
+
+    # Skip folders with results for the same settings (Taylor estimates also depend on padding)
+    settings = result_settings(config)
+    if method == "taylor":
+        settings["fourier_padding"] = config["shifting"]["fourier_padding"]
+    pending_folders = []
+    for folder in folders:
+        prediction_file = prediction_save_dir / folder.name / prediction_file_name
+        if has_result(prediction_file, settings):
+            all_predictions[folder.name] = np.load(prediction_file)
+        else:
+            pending_folders.append(folder)
+    print(
+        f"{len(folders)} folders found, {len(folders) - len(pending_folders)} with existing results skipped."
+    )
+
+    if pending_folders:
+        # Load the CNN model
+        cnn_model = tf.keras.models.load_model(Path(config["path"]["cnn_model_path"]))
+
+        # Create an instance of CNNPredictor
+        cnn_predictor = CNNPredictor(loaded_model=cnn_model)
+
+        shift_sensitivity = ShiftSensitivity(
+            cnn_model,
             shifting_orbitals=config["shifting"]["shifting_orbitals"],
+            dos_calculation_resolution=config["shifting"]["dos_calculation_resolution"],
+            padding=config["shifting"]["fourier_padding"],
         )
-        shifted_dos_arrays = shift_gen.generate_shifted_arrays()
 
-        # c. Feed each shifted array into the CNN model for prediction
-        predictions = []
-        for shifted_dos in shifted_dos_arrays:
-            prediction = cnn_predictor.predict(shifted_dos, adsorbate_dos)
-            predictions.append(prediction)
+    # Step 3: Loop through each folder, loading the next folder while predicting the current one
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        generate_shifts = method == "brute_force"
+        next_folder = (
+            executor.submit(
+                load_and_shift, pending_folders[0], config, data_loader, generate_shifts
+            )
+            if pending_folders
+            else None
+        )
 
-        # d. Feed the unshifted DOS array into the CNN model for a reference point
-        ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)
+        for i, folder in enumerate(tqdm(pending_folders, desc="Processing folders")):
+            print(
+                f"Processing folder {folder.name} ({i + 1} out of {len(pending_folders)})..."
+            )
 
-        # Subtract ref_prediction from each prediction
-        predictions = np.array(predictions) - ref_prediction
+            # a. Collect DOS and shifted arrays, then prefetch the next folder
+            processed_dos, shifted_dos_arrays, shift_values = next_folder.result()
+            if i + 1 < len(pending_folders):
+                next_folder = executor.submit(
+                    load_and_shift,
+                    pending_folders[i + 1],
+                    config,
+                    data_loader,
+                    generate_shifts,
+                )
 
-        # e. Save the predictions for future plotting
-        all_predictions[folder.name] = predictions
+            if method == "brute_force":
+                # b. Feed all shifted arrays into the CNN model in batches
+                predictions = cnn_predictor.predict_batch(
+                    shifted_dos_arrays,
+                    adsorbate_dos,
+                    batch_size=config["shifting"]["batch_size"],
+                    perturbed_orbitals=config["shifting"]["shifting_orbitals"]
+                    if config["shifting"]["branch_cache"]
+                    else None,
+                )
 
-        # Extract the last part of the working directory
-        last_part_of_working_dir = Path(working_dir).name
+                # c. Feed the unshifted DOS array into the CNN model for a reference point
+                ref_prediction = cnn_predictor.predict(processed_dos, adsorbate_dos)
 
-        # Create a specific save path for each folder's predictions
-        prediction_save_path = (
-            prediction_save_base
-            / last_part_of_working_dir
-            / f"shifting_range_{config['shifting']['shifting_range']}-shifting_step_{config['shifting']['shifting_step']}-orbital_{config['shifting']['shifting_orbitals']}"
-            / folder.name
-        )
-        prediction_save_path.mkdir(parents=True, exist_ok=True)
+                # Subtract ref_prediction from each prediction
+                predictions = predictions[:, np.newaxis] - ref_prediction
+
+            else:
+                # b. Estimate prediction changes from derivatives at zero shift
+                predictions, derivatives = shift_sensitivity.taylor_predictions(
+                    processed_dos, adsorbate_dos, shift_values
+                )
+                print(
+                    f"dE/dshift = {derivatives[0]:.4f}, d2E/dshift2 = {derivatives[1]:.4f}"
+                )
+
+            # d. Save the predictions for future plotting
+            all_predictions[folder.name] = predictions
+
+            prediction_save_path = prediction_save_dir / folder.name
+            prediction_save_path.mkdir(parents=True, exist_ok=True)
 
-        # Save the predictions to disk
-        np.save(prediction_save_path / "predictions.npy", predictions)
+            # Save the predictions to disk
+            np.save(prediction_save_path / prediction_file_name, predictions)
+            save_settings(prediction_save_path / prediction_file_name, settings)
 
     # Step 4: Plot
     plotter = ShiftPlotter(all_predictions, config)
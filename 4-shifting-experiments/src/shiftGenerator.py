@@ -3,7 +3,7 @@
 
 import numpy as np
 import warnings
-from typing import List
+from typing import Iterator, List, Tuple
 
 
 class ShiftGenerator:
@@ -25,7 +25,8 @@ class ShiftGenerator:
         Args:
             dos_array (np.ndarray): The pre-processed DOS array of shape (numSamplings, numOrbitals, 1).
             shifting_range (list): A list containing the start and end of the shifting range.
-            shifting_step (float): The step length for each shift.
+            shifting_step (float): The step length for each shift. Steps that are not a multiple of
+                dos_calculation_resolution give sub-grid shifts, which are linearly interpolated.
             shifting_orbitals (list): A list containing the indices of the orbitals to be shifted.
             dos_calculation_resolution (float): The energy resolution along the numSamplings axis of the DOS array.
 
@@ -62,10 +63,6 @@ class ShiftGenerator:
             raise ValueError(
                 f"Invalid orbital indices in shifting_orbitals. Valid range is [0, {numOrbitals-1}]"
             )
-        if not self._is_multiple_of(shifting_step, dos_calculation_resolution):
-            raise ValueError(
-                "shifting_step must be a multiple of dos_calculation_resolution."
-            )
 
         self.dos_array = dos_array
         self.shifting_range = shifting_range
@@ -88,51 +85,222 @@ class ShiftGenerator:
         quotient = number / base
         return np.isclose(quotient, round(quotient))
 
-    def generate_shifted_arrays(self) -> List[np.ndarray]:
+    @property
+    def shift_values(self) -> np.ndarray:
+        """Shift values (in energy unit) from start to end of the shifting range."""
+        start, end = self.shifting_range
+        num_shifts = int(round((end - start) / self.shift_step)) + 1
+
+        return start + self.shift_step * np.arange(num_shifts)
+
+    def _shift_orbitals(
+        self, dos: np.ndarray, shift_values: np.ndarray
+    ) -> np.ndarray:
         """
-        Generate a series of shifted DOS arrays.
+        Shift the columns of a DOS array by several values at once.
+
+        A positive shift moves the DOS towards higher sampling indexes, vacated
+        samplings are zero-padded. Sub-grid shifts are linearly interpolated
+        between the two neighbouring integer shifts.
+
+        Args:
+            dos (np.ndarray): The DOS columns to be shifted, shape (numSamplings, numColumns).
+            shift_values (np.ndarray): Shift values in energy unit, shape (numShifts, ).
 
         Returns:
-            list: A list of shifted DOS arrays.
+            np.ndarray: Shifted DOS of shape (numShifts, numSamplings, numColumns).
+
+        Raises:
+            ValueError: If any shift is greater or equal to the number of samplings.
         """
-        start, end = self.shifting_range
-        shift_values = np.arange(start, end + self.shift_step, self.shift_step)
-        shifted_arrays = []
+        numSamplings = dos.shape[0]
 
-        for shift_value in shift_values:
-            # Create a copy to store the shifted array
-            shifted_dos = np.copy(self.dos_array)
+        # Shift in samplings, snapped to integer if within numerical error
+        sampling_shifts = np.asarray(shift_values) / self.dos_calculation_resolution
+        rounded_shifts = np.rint(sampling_shifts)
+        sampling_shifts = np.where(
+            np.isclose(sampling_shifts, rounded_shifts, atol=1e-6),
+            rounded_shifts,
+            sampling_shifts,
+        )
 
-            # Calculate the number of indices to shift based on dos_calculation_resolution
-            num_indices_to_shift = int(
-                abs(shift_value) / self.dos_calculation_resolution
+        lower_shifts = np.floor(sampling_shifts).astype(int)
+        fractions = sampling_shifts - lower_shifts
+        if np.any(np.abs(lower_shifts) >= numSamplings) or np.any(
+            np.abs(lower_shifts + (fractions > 0)) >= numSamplings
+        ):
+            raise ValueError(
+                "Shift values should be smaller than the data shape, please reduce shifting_range."
             )
 
-            if num_indices_to_shift >= shifted_dos.shape[0]:
-                raise ValueError(
-                    f"Skipping shift value {shift_value} as it is greater or equal to the data shape."
-                )
-
-            for orbital_idx in self.shifting_orbitals:
-                # First, perform the shifting
-                if np.isclose(shift_value, 0, atol=1e-9):  # shift_value ~ 0
-                    shifted_data = shifted_dos[:, orbital_idx, :]
-                elif shift_value > 0:
-                    shifted_data = shifted_dos[:-num_indices_to_shift, orbital_idx, :]
-                else:  # shift_value < 0
-                    shifted_data = shifted_dos[num_indices_to_shift:, orbital_idx, :]
-
-                # Next, perform the zero-padding
-                padding = np.zeros((num_indices_to_shift, 1))
-                if np.isclose(shift_value, 0, atol=1e-9):  # shift_value ~ 0
-                    padded_data = shifted_data
-                elif shift_value > 0:
-                    padded_data = np.concatenate([padding, shifted_data])
-                else:  # shift_value < 0
-                    padded_data = np.concatenate([shifted_data, padding])
-
-                # Assign the padded data back to the array
-                shifted_dos[:, orbital_idx, 0] = padded_data.flatten()
-            shifted_arrays.append(shifted_dos)
+        # Window j of the padded base equals the DOS shifted by (max_shift - j) samplings
+        max_shift = int(np.abs(lower_shifts).max()) + 1
+        padded_dos = np.pad(dos, ((max_shift, max_shift), (0, 0)), mode="constant")
+        windows = np.lib.stride_tricks.sliding_window_view(
+            padded_dos, numSamplings, axis=0
+        )  # shape (2 * max_shift + 1, numColumns, numSamplings)
+
+        lower = windows[max_shift - lower_shifts]
+        upper = windows[max_shift - lower_shifts - 1]
+        fractions = fractions[:, np.newaxis, np.newaxis]
+        shifted = (1.0 - fractions) * lower + fractions * upper
+
+        return shifted.transpose(0, 2, 1)
+
+    def _generate_for_shifts(self, shift_values: np.ndarray) -> np.ndarray:
+        """
+        Generate shifted DOS arrays for given shift values.
+
+        Args:
+            shift_values (np.ndarray): Shift values in energy unit, shape (numShifts, ).
+
+        Returns:
+            np.ndarray: Shifted DOS arrays of shape (numShifts, numSamplings, numOrbitals, 1).
+        """
+        shifted_arrays = np.repeat(
+            self.dos_array[np.newaxis], len(shift_values), axis=0
+        )
+
+        if self.shifting_orbitals:
+            shifted_arrays[:, :, self.shifting_orbitals, 0] = self._shift_orbitals(
+                self.dos_array[:, self.shifting_orbitals, 0], shift_values
+            )
 
         return shifted_arrays
+
+    def generate_shifted_arrays(self) -> np.ndarray:
+        """
+        Generate a series of shifted DOS arrays.
+
+        Returns:
+            np.ndarray: Shifted DOS arrays of shape (numShifts, numSamplings, numOrbitals, 1).
+        """
+        return self._generate_for_shifts(self.shift_values)
+
+    def iter_shifted_batches(
+        self, batch_size: int
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Lazily generate batches of shifted DOS arrays.
+
+        Args:
+            batch_size (int): Maximum number of shifted arrays per batch.
+
+        Yields:
+            tuple: (shift_indices, shifted_arrays), where shifted_arrays is of shape
+            (len(shift_indices), numSamplings, numOrbitals, 1).
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("Batch size must be a positive integer.")
+
+        shift_values = self.shift_values
+        for start in range(0, len(shift_values), batch_size):
+            shift_indices = np.arange(start, min(start + batch_size, len(shift_values)))
+
+            yield shift_indices, self._generate_for_shifts(shift_values[shift_indices])
+
+
+class ShiftGridGenerator:
+    """
+    Class for generating DOS arrays on an N-D grid of independent shifts,
+    one grid axis per orbital group.
+    """
+
+    def __init__(
+        self,
+        dos_array: np.ndarray,
+        orbital_groups: List[list],
+        shifting_ranges: List[list],
+        shifting_steps: List[float],
+        dos_calculation_resolution: float,
+    ) -> None:
+        """
+        Initialize the ShiftGridGenerator.
+
+        Args:
+            dos_array (np.ndarray): The pre-processed DOS array of shape (numSamplings, numOrbitals, 1).
+            orbital_groups (list): Lists of orbital indices shifted together, one per grid axis.
+            shifting_ranges (list): The [start, end] shifting range of each orbital group.
+            shifting_steps (list): The shifting step of each orbital group.
+            dos_calculation_resolution (float): The energy resolution along the numSamplings axis of the DOS array.
+
+        Raises:
+            ValueError: If grid parameters are not consistent, or orbital groups overlap.
+        """
+        if not (len(orbital_groups) == len(shifting_ranges) == len(shifting_steps)):
+            raise ValueError(
+                "orbital_groups, shifting_ranges and shifting_steps should be of the same length."
+            )
+        if not orbital_groups or not all(orbital_groups):
+            raise ValueError("Each orbital group should contain at least one orbital.")
+        all_orbitals = [idx for group in orbital_groups for idx in group]
+        if len(set(all_orbitals)) != len(all_orbitals):
+            raise ValueError("Orbital groups should not overlap.")
+
+        # One ShiftGenerator per grid axis (parameters checked there)
+        self.axis_generators = [
+            ShiftGenerator(
+                dos_array,
+                shifting_range=shifting_range,
+                shifting_step=shifting_step,
+                shifting_orbitals=list(group),
+                dos_calculation_resolution=dos_calculation_resolution,
+            )
+            for group, shifting_range, shifting_step in zip(
+                orbital_groups, shifting_ranges, shifting_steps
+            )
+        ]
+
+        self.dos_array = dos_array
+        self.orbital_groups = [list(group) for group in orbital_groups]
+
+    @property
+    def grid_shape(self) -> Tuple[int, ...]:
+        """Number of shift values along each grid axis."""
+        return tuple(len(gen.shift_values) for gen in self.axis_generators)
+
+    @property
+    def axis_shift_values(self) -> List[np.ndarray]:
+        """Shift values (in energy unit) along each grid axis."""
+        return [gen.shift_values for gen in self.axis_generators]
+
+    def iter_shifted_batches(
+        self, batch_size: int
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Lazily generate batches of shifted DOS arrays over the flattened grid.
+
+        Shifted columns of each orbital group are computed once per shift value,
+        then gathered for every grid point of a batch.
+
+        Args:
+            batch_size (int): Maximum number of shifted arrays per batch.
+
+        Yields:
+            tuple: (flat_indices, shifted_arrays), where flat_indices index the
+            C-ordered grid and shifted_arrays is of shape
+            (len(flat_indices), numSamplings, numOrbitals, 1).
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("Batch size must be a positive integer.")
+
+        # Shifted columns of each group, shape (numShifts, numSamplings, len(group))
+        group_shifts = [
+            gen._shift_orbitals(self.dos_array[:, group, 0], gen.shift_values)
+            for gen, group in zip(self.axis_generators, self.orbital_groups)
+        ]
+
+        num_points = int(np.prod(self.grid_shape))
+        for start in range(0, num_points, batch_size):
+            flat_indices = np.arange(start, min(start + batch_size, num_points))
+            grid_indices = np.unravel_index(flat_indices, self.grid_shape)
+
+            shifted_arrays = np.repeat(
+                self.dos_array[np.newaxis], len(flat_indices), axis=0
+            )
+            for group, shifts, axis_indices in zip(
+                self.orbital_groups, group_shifts, grid_indices
+            ):
+                shifted_arrays[:, :, group, 0] = shifts[axis_indices]
+
+            yield flat_indices, shifted_arrays
@@ -0,0 +1,168 @@
+"""Analytic shift sensitivity of CNN predictions via a differentiable Fourier shift."""
+
+
+import numpy as np
+import tensorflow as tf
+from typing import Tuple
+
+
+class ShiftSensitivity:
+    """
+    Class for computing derivatives of the CNN prediction with respect to a rigid orbital shift.
+
+    The selected orbitals are shifted by a (fractional) number of samplings with
+    the Fourier shift theorem on a zero-padded DOS, which is differentiable with
+    respect to the shift, so derivatives at zero shift come from autodiff.
+
+    Attributes:
+        model (tf.keras.Model): The trained CNN model.
+        shifting_orbitals (list): A list containing the indices of the orbitals to be shifted.
+        dos_calculation_resolution (float): The energy resolution along the numSamplings axis of the DOS array.
+        padding (int): Number of zero samplings padded on both sides before the Fourier transform.
+    """
+
+    def __init__(
+        self,
+        model: tf.keras.Model,
+        shifting_orbitals: list,
+        dos_calculation_resolution: float,
+        padding: int = 500,
+    ) -> None:
+        """
+        Initialize the ShiftSensitivity.
+
+        Args:
+            model (tf.keras.Model): The trained CNN model.
+            shifting_orbitals (list): A list containing the indices of the orbitals to be shifted.
+            dos_calculation_resolution (float): The energy resolution along the numSamplings axis of the DOS array.
+            padding (int, optional): Number of zero samplings padded on both sides, prevents
+                shifted DOS from wrapping around. Defaults to 500.
+
+        Raises:
+            ValueError: If parameters are not valid.
+        """
+        if dos_calculation_resolution <= 0:
+            raise ValueError("DOS calculation resolution must be greater than zero.")
+        if not isinstance(padding, int) or padding < 0:
+            raise ValueError("Padding must be a non-negative integer.")
+        if len(set(shifting_orbitals)) != len(shifting_orbitals):
+            raise ValueError("Duplicate orbital indices found in shifting_orbitals.")
+
+        self.model = model
+        self.shifting_orbitals = list(shifting_orbitals)
+        self.dos_calculation_resolution = dos_calculation_resolution
+        self.padding = padding
+
+    def _fourier_shift(self, dos_array: tf.Tensor, shift: tf.Tensor) -> tf.Tensor:
+        """
+        Shift selected orbitals of a DOS array by a fractional number of samplings.
+
+        A positive shift moves the DOS towards higher sampling indexes.
+
+        Args:
+            dos_array (tf.Tensor): The DOS array of shape (numSamplings, numOrbitals, 1).
+            shift (tf.Tensor): Scalar shift in samplings.
+
+        Returns:
+            tf.Tensor: The shifted DOS array of shape (numSamplings, numOrbitals, 1).
+        """
+        numSamplings, numOrbitals = dos_array.shape[0], dos_array.shape[1]
+        fft_length = numSamplings + 2 * self.padding
+
+        # Zero-padded orbitals along last axis, shape (numOrbitals, fft_length)
+        columns = tf.pad(
+            tf.transpose(dos_array[:, :, 0]), [[0, 0], [self.padding, self.padding]]
+        )
+
+        # Multiply spectrum by linear phase exp(-2 pi i f shift)
+        frequencies = tf.range(fft_length // 2 + 1, dtype=tf.float32) / fft_length
+        phase = tf.exp(
+            tf.complex(tf.zeros_like(frequencies), -2.0 * np.pi * frequencies * shift)
+        )
+        shifted_columns = tf.signal.irfft(
+            tf.signal.rfft(columns) * phase, fft_length=[fft_length]
+        )[:, self.padding : self.padding + numSamplings]
+
+        # Replace selected orbitals only
+        mask = np.isin(np.arange(numOrbitals), self.shifting_orbitals)[:, np.newaxis]
+        columns = tf.where(mask, shifted_columns, tf.transpose(dos_array[:, :, 0]))
+
+        return tf.transpose(columns)[:, :, tf.newaxis]
+
+    @tf.function
+    def _derivatives(
+        self, dos_array: tf.Tensor, adsorbate_dos: tf.Tensor
+    ) -> Tuple[tf.Tensor, tf.Tensor, tf.Tensor]:
+        """
+        Compute prediction and its first/second derivatives to the shift (in samplings) at zero shift.
+
+        Args:
+            dos_array (tf.Tensor): The DOS array of shape (numSamplings, numOrbitals, 1).
+            adsorbate_dos (tf.Tensor): The adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+
+        Returns:
+            tuple: Prediction, first derivative and second derivative.
+        """
+        shift = tf.constant(0.0)
+
+        with tf.GradientTape() as outer_tape:
+            outer_tape.watch(shift)
+            with tf.GradientTape() as inner_tape:
+                inner_tape.watch(shift)
+                shifted_dos = self._fourier_shift(dos_array, shift)
+                prediction = self.model(
+                    tf.concat([shifted_dos, adsorbate_dos], axis=-1)[tf.newaxis],
+                    training=False,
+                )[0, 0]
+            first_derivative = inner_tape.gradient(prediction, shift)
+        second_derivative = outer_tape.gradient(first_derivative, shift)
+
+        return prediction, first_derivative, second_derivative
+
+    def derivatives(
+        self, dos_array: np.ndarray, adsorbate_dos: np.ndarray
+    ) -> Tuple[float, float]:
+        """
+        Compute first and second derivatives of the prediction to the shift at zero shift.
+
+        Args:
+            dos_array (np.ndarray): The DOS array of shape (numSamplings, numOrbitals, 1).
+            adsorbate_dos (np.ndarray): The adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+
+        Returns:
+            tuple: dE/d(shift) in eV/eV and d2E/d(shift)2 in eV/eV^2.
+        """
+        _, first_derivative, second_derivative = self._derivatives(
+            tf.constant(dos_array, dtype=tf.float32),
+            tf.constant(adsorbate_dos, dtype=tf.float32),
+        )
+
+        # Convert from per sampling to per eV
+        return (
+            float(first_derivative) / self.dos_calculation_resolution,
+            float(second_derivative) / self.dos_calculation_resolution**2,
+        )
+
+    def taylor_predictions(
+        self, dos_array: np.ndarray, adsorbate_dos: np.ndarray, shift_values: np.ndarray
+    ) -> Tuple[np.ndarray, Tuple[float, float]]:
+        """
+        Estimate prediction changes across shift values from a second-order Taylor expansion.
+
+        Args:
+            dos_array (np.ndarray): The DOS array of shape (numSamplings, numOrbitals, 1).
+            adsorbate_dos (np.ndarray): The adsorbate DOS of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+            shift_values (np.ndarray): Shift values in eV.
+
+        Returns:
+            tuple: Estimated prediction changes of shape (numShifts, 1), and the
+            first and second derivatives.
+        """
+        first_derivative, second_derivative = self.derivatives(dos_array, adsorbate_dos)
+
+        shift_values = np.asarray(shift_values)
+        predictions = (
+            first_derivative * shift_values + 0.5 * second_derivative * shift_values**2
+        )
+
+        return predictions[:, np.newaxis], (first_derivative, second_derivative)
@@ -27,6 +27,8 @@ if __name__ == "__main__":
     descriptor_x = cfg["reaction"]["descriptor_x"]
     group_y = cfg["reaction"]["group_y"]
     descriptor_y = cfg["reaction"]["descriptor_y"]
+    mixing_ratios = cfg["reaction"]["mixing_ratios"]
+    mixing_ratio_resolution = cfg["reaction"]["mixing_ratio_resolution"]
 
     external_potential = cfg["corrections"]["external_potential"]
 
@@ -45,9 +47,10 @@ if __name__ == "__main__":
     calculator = scalingRelation(
         adsorption_energy_dict=loader.adsorption_free_energy,
         descriptors=(descriptor_x, descriptor_y),
-        mixing_ratios="AUTO",
+        mixing_ratios=mixing_ratios,
         verbose=True,
-        remove_ads_prefix=True
+        remove_ads_prefix=True,
+        ratio_resolution=mixing_ratio_resolution,
         )
 
     # Print linear regression parameters of free energy
@@ -74,6 +77,7 @@ if __name__ == "__main__":
         descriptors=(descriptor_x, descriptor_y),
         adsorption_free_energies=loader.adsorption_free_energy,
         markers=markers,
+        density=tuple(cfg["plot"]["density"]),
         )
 
     # Generate CO2RR limiting potential volcano plot
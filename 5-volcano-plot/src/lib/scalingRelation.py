@@ -1,13 +1,22 @@
 """Calculate adsorption energy linear scaling relations."""
 
 
+from collections import namedtuple
 import warnings
 import numpy as np
+import pandas as pd
 from scipy import stats
 
 from .utils import stack_adsorption_energy_dict
 
 
+# Same fields as scipy.stats.linregress results
+LinregressResult = namedtuple(
+    "LinregressResult",
+    ["slope", "intercept", "rvalue", "pvalue", "stderr", "intercept_stderr"],
+)
+
+
 class scalingRelation:
     def __init__(
         self,
@@ -16,6 +25,7 @@ class scalingRelation:
         mixing_ratios,
         verbose=True,
         remove_ads_prefix=False,
+        ratio_resolution=1,
     ):
         """Calculate adsorption energy linear scaling relations.
 
@@ -24,18 +34,24 @@ class scalingRelation:
                 value is pd.DataFrame for adsorption energies
             descriptors (list): [descriptor_x_axis, descriptor_y_axis]
             mixing_ratios (str, tuple): "AUTO" for automatic finding of best ratios,
+                "LSTSQ" for unconstrained two-descriptor regression E = a * x + b * y + c,
                 or (x_ratio, y_ratio)
             verbose (bool, optional): verbose. Defaults to True.
             remove_prefix (bool, optional): remove prefix from adsorbate names. Defaults to False.
+            ratio_resolution (int, float, optional): step of mixing ratios (in %) tested
+                in "AUTO" mode, e.g. 0.1. Defaults to 1.
 
         """
         # Check args
         assert isinstance(adsorption_energy_dict, dict)
         assert len(descriptors) == 2 and (descriptors[0] != descriptors[1])
-        assert mixing_ratios == "AUTO" or (
+        assert mixing_ratios in {"AUTO", "LSTSQ"} or (
             isinstance(mixing_ratios, tuple) and len(mixing_ratios) == 2
         )
         assert isinstance(verbose, bool)
+        assert ratio_resolution > 0 and np.isclose(
+            100 / ratio_resolution, round(100 / ratio_resolution)
+        ), "100 should be a multiple of ratio_resolution."
 
         # Update attributes
         self.descriptors = descriptors
@@ -48,16 +64,17 @@ class scalingRelation:
         )
         self.adsorbates = list(self._stacked_adsorption_energy_df.columns.values)
 
+        # Unconstrained two-descriptor regression (no mixing ratio)
+        if mixing_ratios == "LSTSQ":
+            self.__fit_lstsq()
+            return
+
         # Automatic mixing ratio regression
         if mixing_ratios == "AUTO":
-            # Test mixing ratio
-            mixing_ratio_test_result = {}
-            for ratio in range(101):
-                mixing_ratio_test_result[
-                    ratio
-                ] = self.__fit_all_adsorbates_with_given_ratio(
-                    ratios=[ratio, 100 - ratio],
-                )
+            # Test all mixing ratios at once
+            mixing_ratio_test_result = self.__fit_all_adsorbates_with_all_ratios(
+                ratio_resolution
+            )
 
             # Add mixing ratio test results to attrib
             self.mixing_ratio_results = mixing_ratio_test_result
@@ -106,14 +123,16 @@ class scalingRelation:
         for ads in self.adsorbates:
             # find best mixing ratio
             best = max(result_dict[ads])
-            best_index = result_dict[ads].index(best)
+            best_index = list(mixing_ratio_test_result)[result_dict[ads].index(best)]
             best_ratios[ads] = best_index
 
             # verbose
             if self._verbose:
                 # find worst mixing ratio
                 worst = min(result_dict[ads])
-                worst_index = result_dict[ads].index(worst)
+                worst_index = list(mixing_ratio_test_result)[
+                    result_dict[ads].index(worst)
+                ]
 
                 # print best and worst results
                 print(
@@ -122,40 +141,133 @@ class scalingRelation:
 
                 # print results at end points
                 print(
-                    f"End point results for {ads}: 0 %: {result_dict[ads][0]:.4f}, 100 %: {result_dict[ads][100]:.4f}."
+                    f"End point results for {ads}: 0 %: {result_dict[ads][0]:.4f}, 100 %: {result_dict[ads][-1]:.4f}."
                 )
 
         return best_ratios
 
-    def __fit_all_adsorbates_with_given_ratio(self, ratios):
-        """Perform linear regression for ALL adsorbates with: selected two descriptors and given mixing ratios.
+    def __fit_all_adsorbates_with_all_ratios(self, ratio_resolution):
+        """Perform linear regression for ALL adsorbates and ALL mixing ratios at once.
+
+        Hybrid descriptors of all ratios are stacked as a matrix, and slope,
+        intercept and r of every (ratio, adsorbate) pair are computed in closed form,
+        giving the same results as scipy.stats.linregress.
 
         Args:
-            ratios (list): [x_descriptor_ratio, y_descriptor_ratio]
+            ratio_resolution (int, float): step of x descriptor ratio (in %)
 
         Returns:
-            dict: descriptor regression results, key is adsorbate name, value is linear regression results
+            dict: mixing ratio test results, key is x descriptor ratio (in %),
+                value is dict of linear regression results keyed by adsorbate name
 
         """
-        # Check args
-        for p in ratios:
-            assert 0 <= p <= 100
-        assert ratios[0] + ratios[1] == 100
-
-        # Compile hybrid descriptor
-        hybrid_descriptor = (
-            self._stacked_adsorption_energy_df[self.descriptors[0]] * ratios[0]
-            + self._stacked_adsorption_energy_df[self.descriptors[1]] * ratios[1]
+        # Compile hybrid descriptors, shape (num_ratios, num_samples)
+        num_ratios = int(round(100 / ratio_resolution)) + 1
+        ratios = np.linspace(0, 100, num_ratios)
+        descriptor_x = self._stacked_adsorption_energy_df[self.descriptors[0]].to_numpy(dtype=float)
+        descriptor_y = self._stacked_adsorption_energy_df[self.descriptors[1]].to_numpy(dtype=float)
+        hybrid_descriptors = (
+            np.outer(ratios, descriptor_x) + np.outer(100 - ratios, descriptor_y)
         ) * 0.01
 
-        # Perform linear regression for each adsorbate
+        # Adsorption energies, shape (num_samples, num_adsorbates)
+        energies = self._stacked_adsorption_energy_df[self.adsorbates].to_numpy(dtype=float)
+        num_samples = energies.shape[0]
+
+        # Closed-form least squares for every (ratio, adsorbate) pair
+        descriptor_mean = hybrid_descriptors.mean(axis=1)
+        energy_mean = energies.mean(axis=0)
+        centered_descriptors = hybrid_descriptors - descriptor_mean[:, np.newaxis]
+        centered_energies = energies - energy_mean
+
+        ssxm = np.einsum("ij,ij->i", centered_descriptors, centered_descriptors)
+        ssym = np.einsum("ij,ij->j", centered_energies, centered_energies)
+        ssxym = centered_descriptors @ centered_energies  # (num_ratios, num_adsorbates)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = ssxym / ssxm[:, np.newaxis]
+            intercept = energy_mean - slope * descriptor_mean[:, np.newaxis]
+            rvalue = np.clip(ssxym / np.sqrt(np.outer(ssxm, ssym)), -1.0, 1.0)
+
+            # Significance and standard errors (as in scipy.stats.linregress)
+            dof = num_samples - 2
+            tvalue = rvalue * np.sqrt(dof / ((1.0 - rvalue) * (1.0 + rvalue)))
+            pvalue = 2 * stats.t.sf(np.abs(tvalue), dof)
+            stderr = np.sqrt((1 - rvalue**2) * ssym / ssxm[:, np.newaxis] / dof)
+            intercept_stderr = stderr * np.sqrt(
+                (ssxm + num_samples * descriptor_mean**2) / num_samples
+            )[:, np.newaxis]
+
+        # Unpack into nested dict of regression results
+        ratio_keys = [
+            int(round(i)) if float(ratio_resolution).is_integer() else round(float(i), 6)
+            for i in ratios
+        ]
         return {
-            ads: stats.linregress(
-                hybrid_descriptor, self._stacked_adsorption_energy_df[ads]
-            )
-            for ads in self._stacked_adsorption_energy_df.columns.values
+            ratio: {
+                ads: LinregressResult(
+                    slope[i, j],
+                    intercept[i, j],
+                    rvalue[i, j],
+                    pvalue[i, j],
+                    stderr[i, j],
+                    intercept_stderr[i, j],
+                )
+                for j, ads in enumerate(self.adsorbates)
+            }
+            for i, ratio in enumerate(ratio_keys)
         }
 
+    def __fit_lstsq(self):
+        """Fit E_ads = a * x + b * y + c for all adsorbates in one least-squares solve.
+
+        Attrib:
+            regress_paras (dict): key is adsorbate name, value is [para_descriptor_x, para_descriptor_y, c]
+            r2_scores (dict): coefficient of determination, key is adsorbate name
+            residuals (dict): residuals (pd.Series) of each sample, key is adsorbate name
+
+        """
+        df = self._stacked_adsorption_energy_df
+
+        # Design matrix [x, y, 1] and energies of all adsorbates
+        design_matrix = np.column_stack(
+            [
+                df[self.descriptors[0]].to_numpy(dtype=float),
+                df[self.descriptors[1]].to_numpy(dtype=float),
+                np.ones(len(df)),
+            ]
+        )
+        energies = df[self.adsorbates].to_numpy(dtype=float)
+
+        paras, _, _, _ = np.linalg.lstsq(design_matrix, energies, rcond=None)
+
+        # R2 score and residuals
+        residuals = energies - design_matrix @ paras
+        ss_res = np.sum(residuals**2, axis=0)
+        ss_tot = np.sum((energies - energies.mean(axis=0)) ** 2, axis=0)
+        r2_scores = 1 - ss_res / ss_tot
+
+        self.regress_paras = {}
+        self.r2_scores = {}
+        self.residuals = {}
+        for i, ads in enumerate(self.adsorbates):
+            # Warn user if R2 score is too low (same threshold as multiple correlation coefficient)
+            if np.sqrt(max(r2_scores[i], 0)) < 0.75:
+                warnings.warn(
+                    f"R2 regression of adsorbate {ads} is too low at {r2_scores[i]}."
+                )
+
+            if self._verbose:
+                print(
+                    f'Least-squares fit of "{ads}": a = {paras[0, i]:.4f}, b = {paras[1, i]:.4f}, c = {paras[2, i]:.4f} (R2 {r2_scores[i]:.4f}).'
+                )
+
+            if self._remove_ads_prefix:
+                ads = ads.split("-")[-1]  # remove "X-" from naming of adsorbates "X-CO2"
+            self.regress_paras[ads] = paras[:, i]
+            self.r2_scores[ads] = r2_scores[i]
+            self.residuals[ads] = pd.Series(residuals[:, i], index=df.index)
+
     def __fit_with_best_ratios(
         self,
     ):
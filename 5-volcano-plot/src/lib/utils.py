@@ -36,6 +36,27 @@ def stack_adsorption_energy_dict(
     return df
 
 
+def to_roman_numeral(number) -> str:
+    """Convert positive integer to Roman numeral (for RDS labels).
+
+    Args:
+        number (int): positive integer
+
+    """
+    # Check args
+    assert isinstance(number, int) and number >= 1
+
+    numerals = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+                (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+
+    roman = ""
+    for value, numeral in numerals:
+        count, number = divmod(number, value)
+        roman += numeral * count
+
+    return roman
+
+
 # Test area
 if __name__ == "__main__":
     # Set args
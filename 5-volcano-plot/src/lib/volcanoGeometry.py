@@ -0,0 +1,203 @@
+"""Analytic geometry of volcano plot (RDS regions, boundaries and apex)."""
+
+
+import numpy as np
+
+
+class volcanoGeometry:
+    def __init__(self, scaling_relation, x_range, y_range, tolerance=1e-9):
+        """Exact piecewise-linear geometry of a limiting potential volcano.
+
+        Free energy change of each reaction step is a plane a * x + b * y + c
+        over the descriptors. The RDS is the step with max free energy change,
+        so the RDS region of each step is the plot window clipped by half-planes
+        where that plane lies on the upper envelope, and the volcano apex
+        (min of the envelope) sits on a vertex of these regions.
+
+        Args:
+            scaling_relation (dict): reaction step scaling relations, values in [a, b, c]
+            x_range (tuple): x range of plot window
+            y_range (tuple): y range of plot window
+            tolerance (float, optional): numerical tolerance in eV. Defaults to 1e-9.
+
+        """
+        # Check args
+        assert isinstance(scaling_relation, dict) and len(scaling_relation) >= 1
+        assert len(x_range) == 2 and x_range[0] < x_range[1]
+        assert len(y_range) == 2 and y_range[0] < y_range[1]
+
+        # Update attrib
+        self.steps = list(scaling_relation.keys())
+        self.paras = np.array(list(scaling_relation.values()), dtype=float)
+        self.x_range = tuple(x_range)
+        self.y_range = tuple(y_range)
+        self.tolerance = tolerance
+
+        self.regions = self.__calculate_regions()
+
+    def __clip_polygon(self, polygon, coeffs):
+        """Clip convex polygon by half-plane p * x + q * y + r <= 0 (Sutherland-Hodgman).
+
+        Args:
+            polygon (np.ndarray): polygon vertices in shape (numVertices, 2)
+            coeffs (np.ndarray): half-plane coefficients [p, q, r]
+
+        Returns:
+            np.ndarray: clipped polygon vertices in shape (numVertices, 2)
+
+        """
+        if len(polygon) == 0:
+            return polygon
+
+        values = polygon @ coeffs[:2] + coeffs[2]
+        inside = values <= self.tolerance
+
+        clipped = []
+        for i in range(len(polygon)):
+            j = (i + 1) % len(polygon)
+            if inside[i]:
+                clipped.append(polygon[i])
+
+            # Add intersection where edge crosses the boundary line
+            if inside[i] != inside[j]:
+                t = values[i] / (values[i] - values[j])
+                clipped.append(polygon[i] + t * (polygon[j] - polygon[i]))
+
+        return np.array(clipped).reshape(-1, 2)
+
+    def __calculate_regions(self):
+        """Calculate RDS region polygon of each step.
+
+        Returns:
+            dict: RDS region vertices (counter-clockwise) in shape (numVertices, 2), key is step index (starts from 0)
+
+        Notes:
+            1. Identical planes are assigned to the first step, consistent with argmax.
+            2. Steps never being RDS inside plot window are excluded.
+
+        """
+        window = np.array([
+            [self.x_range[0], self.y_range[0]],
+            [self.x_range[1], self.y_range[0]],
+            [self.x_range[1], self.y_range[1]],
+            [self.x_range[0], self.y_range[1]],
+        ])
+
+        regions = {}
+        for i, para in enumerate(self.paras):
+            polygon = window
+            for j, other_para in enumerate(self.paras):
+                if i == j:
+                    continue
+
+                # Step i is RDS where plane j minus plane i <= 0
+                coeffs = other_para - para
+                if np.all(np.abs(coeffs) <= self.tolerance):
+                    if j < i:
+                        polygon = polygon[:0]
+                    continue
+                polygon = self.__clip_polygon(polygon, coeffs)
+
+            polygon = self.__remove_duplicate_vertices(polygon)
+            if len(polygon) >= 3 and self.__polygon_area(polygon) > self.tolerance:
+                regions[i] = polygon
+
+        return regions
+
+    def __remove_duplicate_vertices(self, polygon):
+        """Remove consecutive duplicate vertices of polygon."""
+        if len(polygon) == 0:
+            return polygon
+
+        keep = np.linalg.norm(polygon - np.roll(polygon, -1, axis=0), axis=1) > self.tolerance
+
+        return polygon[keep]
+
+    @staticmethod
+    def __polygon_area(polygon):
+        """Calculate polygon area with shoelace formula."""
+        x, y = polygon[:, 0], polygon[:, 1]
+
+        return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+    def envelope(self, x, y):
+        """Calculate max free energy change over all steps (negative limiting potential).
+
+        Args:
+            x (float, np.ndarray): descriptor x
+            y (float, np.ndarray): descriptor y
+
+        Returns:
+            np.ndarray: max free energy change in eV
+
+        """
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+        return np.max(
+            np.multiply.outer(self.paras[:, 0], x)
+            + np.multiply.outer(self.paras[:, 1], y)
+            + self.paras[:, 2].reshape((-1, ) + (1, ) * x.ndim),
+            axis=0,
+        )
+
+    def boundaries(self):
+        """Calculate boundary segments between adjacent RDS regions.
+
+        Returns:
+            list: boundary segments in ((step_i, step_j), np.ndarray in shape (2, 2)), with step_i < step_j
+
+        """
+        segments = []
+        for i, polygon in self.regions.items():
+            for j in self.regions:
+                if j <= i:
+                    continue
+
+                # Edges of region i lying on the plane intersection line of i and j
+                coeffs = self.paras[j] - self.paras[i]
+                on_line = np.abs(polygon @ coeffs[:2] + coeffs[2]) <= 1e3 * self.tolerance
+                for k in range(len(polygon)):
+                    k_next = (k + 1) % len(polygon)
+                    if on_line[k] and on_line[k_next]:
+                        segments.append(((i, j), np.array([polygon[k], polygon[k_next]])))
+
+        return segments
+
+    def apex(self):
+        """Locate volcano apex (max limiting potential) inside plot window.
+
+        Returns:
+            tuple: (x, y, limiting potential in V, RDS step index)
+
+        """
+        vertices = np.concatenate(list(self.regions.values()))
+        values = self.envelope(vertices[:, 0], vertices[:, 1])
+
+        index = np.argmin(values)
+        x_coord, y_coord = vertices[index]
+        rds = int(np.argmax(self.paras[:, :2] @ vertices[index] + self.paras[:, 2]))
+
+        return x_coord, y_coord, -values[index], rds
+
+    def label_positions(self):
+        """Calculate label position (vertex centroid) of each RDS region.
+
+        Returns:
+            dict: label (x, y) coordinates, key is step index (starts from 0)
+
+        """
+        return {i: tuple(polygon.mean(axis=0)) for i, polygon in self.regions.items()}
+
+
+# Test area
+if __name__ == "__main__":
+    # Two-step reaction with RDS boundary along x == y
+    geometry = volcanoGeometry(
+        {"step_1": [1.0, 0.0, 0.0], "step_2": [0.0, 1.0, 0.0]},
+        x_range=(-1, 1),
+        y_range=(-1, 1),
+    )
+
+    print(geometry.regions)
+    print(geometry.boundaries())
+    print(geometry.apex())
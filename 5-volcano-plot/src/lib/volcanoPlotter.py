@@ -7,11 +7,15 @@ from matplotlib import rcParams
 from matplotlib.colors import BoundaryNorm
 from matplotlib.colors import ListedColormap
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
 import matplotlib.pyplot as plt
 import numpy as np
 import warnings
-from typing import Tuple
+from typing import Optional, Tuple
+
+from .utils import to_roman_numeral
+from .volcanoGeometry import volcanoGeometry
 
 rcParams["font.family"] = "sans-serif"
 rcParams["font.sans-serif"] = ["Arial"]
@@ -26,9 +30,13 @@ class volcanoPlotter:
         descriptors,
         adsorption_free_energies,
         dpi=300,
+        density=(400, 400),
         *args,
         **kwargs
     ):
+        # Check args
+        assert len(density) == 2 and all(isinstance(i, int) and i >= 2 for i in density)
+
         # Update attrib
         self.scaling_relations = scaling_relations
         self.x_range = x_range
@@ -36,6 +44,7 @@ class volcanoPlotter:
         self.descriptors = descriptors
         self.adsorption_free_energies = adsorption_free_energies
         self.dpi = dpi
+        self.density = tuple(density)
 
         for key, value in kwargs.items():
             exec(f"self.{key}={value}")
@@ -78,11 +87,12 @@ class volcanoPlotter:
 
         return cbar
 
-    def __add_markers(self, plt, label_selection="ALL") -> None:
+    def __add_markers(self, plt, apex, label_selection="ALL") -> None:
         """Add original data points to volcano plot.
 
         Args:
             plt (module): plt
+            apex (tuple): (x, y) coordinates of limiting potential maximum, marker alpha decreases with distance to it
             label_selection ((str, list), optional): add labels to selected points or "ALL", select by substrate. Defaults to "ALL".
         """
 
@@ -97,11 +107,7 @@ class volcanoPlotter:
                 np.ndarray: alpha array
             """
             # Locate the maximum
-            max_index = np.unravel_index(
-                np.argmax(self.limiting_potential_mesh),
-                self.limiting_potential_mesh.shape,
-            )
-            x_coord, y_coord = self.x[max_index[1]], self.y[max_index[0]]
+            x_coord, y_coord = apex[:2]
 
             # Calculate distance to maximum
             distances = []
@@ -215,16 +221,17 @@ class volcanoPlotter:
                 alpha=alphas[i],
             )
 
-    def __add_rds_separator(self, plt) -> None:
+    def __add_rds_separator(self, plt, reaction_name) -> None:
         """Add separator lines and RDS index for each rate determining step area.
 
         Args:
-            plt (_type_): _description_
+            plt (module): plt
+            reaction_name (str): reaction name
 
-        Note:
-            TODO: temporary manual-method, need improvement
         """
-        warnings.warn("RDS separator manually created.")
+        geometry = volcanoGeometry(
+            self.scaling_relations[reaction_name], self.x_range, self.y_range
+        )
 
         # Add separator lines
         line_width = 3
@@ -234,118 +241,106 @@ class volcanoPlotter:
             (1, 1.5),  # (offset, (on_off_seq)) (ref: https://matplotlib.org/stable/gallery/lines_bars_and_markers/linestyles.html)
         )
 
-        plt.plot(
-            [-5.00, -3.40, -1.23, -0.96, -2.08],
-            [-5.23, -4.92, -2.43, -1.43, 0],
-            linewidth=line_width,
-            color=line_color,
-            linestyle=line_style,
-            dash_capstyle="round",
-        )
-        plt.plot(
-            [-3.40, -3.10],
-            [-4.92, -6.50],
-            linewidth=line_width,
-            color=line_color,
-            linestyle=line_style,
-            dash_capstyle="round",
-        )
-        plt.plot(
-            [-1.23, 0.5],
-            [-2.43, -2.38],
-            linewidth=line_width,
-            color=line_color,
-            linestyle=line_style,
-            dash_capstyle="round",
-        )
-        plt.plot(
-            [-0.96, 0.5],
-            [-1.43, -0.71],
-            linewidth=line_width,
-            color=line_color,
-            linestyle=line_style,
-            dash_capstyle="round",
-        )
+        for _, segment in geometry.boundaries():
+            plt.plot(
+                segment[:, 0],
+                segment[:, 1],
+                linewidth=line_width,
+                color=line_color,
+                linestyle=line_style,
+                dash_capstyle="round",
+            )
 
-        # Add RDS indexes (starts from 1)
+        # Add RDS indexes (starts from 1) at region centres
         font_size = 30
 
-        plt.text(-4.8, -6.2, "I", fontsize=font_size)
-        plt.text(-4.8, -0.5, "II", fontsize=font_size)
-        plt.text(0, -6.2, "III", fontsize=font_size)
-        plt.text(0.25, -1.7, "V", fontsize=font_size)
-        plt.text(-0.75, -0.4, "VII", fontsize=font_size)
+        for step, (x_coord, y_coord) in geometry.label_positions().items():
+            plt.text(
+                x_coord,
+                y_coord,
+                to_roman_numeral(step + 1),
+                fontsize=font_size,
+                ha="center",
+                va="center",
+            )
 
-    def __generate_free_energy_change_mesh(
-        self,
-        reaction_name,
-        density=(400, 400)
-        ) -> dict:
-        """Generate 2D free energy change mesh for plotting.
+    def __find_apex(self, reaction_name) -> Tuple[float, float, float, int]:
+        """Find exact limiting potential maximum of selected reaction within plot range.
 
         Args:
-            reaction_name (str): reaction energy
-            density (tuple, optional): mesh density in (x, y) directions. Defaults to (400, 400).
-
-        Raises:
-            KeyError: if reaction name not in scaling relation dict
+            reaction_name (str): reaction name
 
         Returns:
-            dict: free energy change for each reaction step
+            tuple: (x, y, limiting potential, RDS index) at the maximum
         """
-        # Check for requested reaction name
-        if reaction_name not in self.scaling_relations:
-            raise KeyError(f"Cannot find entry for reaction {reaction_name}")
-
-        # Generate 2D mesh
-        self.x = np.linspace(self.x_range[0], self.x_range[1], density[0])
-        self.y = np.linspace(self.y_range[0], self.y_range[1], density[1])
-        self.xx, self.yy = np.meshgrid(
-            self.x,
-            self.y,
-        )
-
-        # Get free energy change for each reaction step
-        return {
-            step_index: self.xx * paras[0] + self.yy * paras[1] + paras[2]
-            # Calculate free energy value for each point on mesh
-            for step_index, paras in self.scaling_relations[reaction_name].items()
-        }
+        return volcanoGeometry(
+            self.scaling_relations[reaction_name], self.x_range, self.y_range
+        ).apex()
 
     def __generate_limiting_potential_and_RDS_mesh(
         self,
-        free_energy_change_mesh,
-        reaction_name=None,
+        reaction_name,
         show_best=True,
+        max_tile_size=2**22,
     ) -> Tuple[np.ndarray, np.ndarray]:
-        """Generate limiting potential mesh from free energy change meshes.
+        """Generate limiting potential and RDS meshes of selected reaction.
+
+        Free energy change of each step is a plane a * x + b * y + c over the
+        descriptor mesh. Planes of all steps are evaluated tile by tile (rows of y)
+        as a broadcast (numSteps, y, x) array, and reduced to limiting potential
+        and RDS in the same pass, so the full meshes of all steps are never stored.
 
         Args:
-            free_energy_change_mesh (dict): free energy mesh in (x, y, numSteps)
             reaction_name (str): reaction name
+            show_best (bool, optional): print best limiting potential and its location. Defaults to True.
+            max_tile_size (int, optional): maximum number of elements of a (numSteps, y, x) tile. Defaults to 2**22.
+
+        Raises:
+            KeyError: if reaction name not in scaling relation dict
 
         Returns:
-            np.ndarray: 2D limiting potential mesh
-            np.ndarray: 2D RDS mesh
+            np.ndarray: 2D limiting potential mesh in (y, x)
+            np.ndarray: 2D RDS mesh in (y, x), index of step with max free energy change (starts from 0)
         """
-        # Stack all meshes of different steps into shape (density_x, density_y, numSteps)
-        stacked_mesh = np.stack(list(free_energy_change_mesh.values()), axis=2)
+        # Check for requested reaction name
+        if reaction_name not in self.scaling_relations:
+            raise KeyError(f"Cannot find entry for reaction {reaction_name}")
 
-        # Generate limiting potential mesh (negate max of free energy change)
-        limiting_potential_mesh = -np.amax(stacked_mesh, axis=2)
+        # Generate 1D mesh axes
+        self.x = np.linspace(self.x_range[0], self.x_range[1], self.density[0])
+        self.y = np.linspace(self.y_range[0], self.y_range[1], self.density[1])
 
-        # Generate limiting potential mesh (index of min limiting potential)
-        rds_mesh = np.argmin(stacked_mesh, axis=2)
+        # Scaling relation parameters of all steps, shape (numSteps, 3)
+        paras = np.array(list(self.scaling_relations[reaction_name].values()))
+        num_steps = paras.shape[0]
 
-        # Find x/y coordinates of maximum (predicted best limiting potential)
-        max_index = np.unravel_index(
-            np.argmax(limiting_potential_mesh), limiting_potential_mesh.shape
+        limiting_potential_mesh = np.empty((len(self.y), len(self.x)))
+        rds_mesh = np.empty(
+            (len(self.y), len(self.x)), dtype=np.min_scalar_type(num_steps + 1)
         )
-        x_coord, y_coord = self.x[max_index[1]], self.y[max_index[0]]
 
+        # Partial plane without y term, shape (numSteps, 1, x)
+        plane_x = (paras[:, 0, np.newaxis] * self.x + paras[:, 2, np.newaxis])[:, np.newaxis, :]
+
+        tile_rows = max(1, max_tile_size // (num_steps * len(self.x)))
+        for start in range(0, len(self.y), tile_rows):
+            y_tile = self.y[start : start + tile_rows]
+
+            # Free energy change of each step, shape (numSteps, y_tile, x)
+            free_energy_change = plane_x + paras[:, 1, np.newaxis, np.newaxis] * y_tile[:, np.newaxis]
+
+            # Limiting potential is set by the step with max free energy change (RDS)
+            rds_tile = np.argmax(free_energy_change, axis=0)
+            rds_mesh[start : start + tile_rows] = rds_tile
+            limiting_potential_mesh[start : start + tile_rows] = -np.take_along_axis(
+                free_energy_change, rds_tile[np.newaxis], axis=0
+            )[0]
+
+        # Find exact x/y coordinates of maximum (predicted best limiting potential)
         if show_best:
+            x_coord, y_coord, best_limiting_potential, _ = self.__find_apex(reaction_name)
             print(
-                f"Limiting potential of best {reaction_name} catalysts is {np.max(limiting_potential_mesh):.4f} V, at X {x_coord:.4f} eV, Y {y_coord:.4f} eV."
+                f"Limiting potential of best {reaction_name} catalysts is {best_limiting_potential:.4f} V, at X {x_coord:.4f} eV, Y {y_coord:.4f} eV."
             )
 
         return limiting_potential_mesh, rds_mesh
@@ -394,12 +389,9 @@ class volcanoPlotter:
             show (bool, optional): show plot after creation. Defaults to False.
 
         """
-        # Generate free energy change mesh for selected reaction
-        free_energy_change_mesh = self.__generate_free_energy_change_mesh(reaction_name)
-
-        # Generate limiting potential mesh
+        # Generate limiting potential mesh for selected reaction
         self.limiting_potential_mesh, _ = self.__generate_limiting_potential_and_RDS_mesh(
-            free_energy_change_mesh, reaction_name
+            reaction_name
             )
 
         # Create plt object
@@ -418,8 +410,8 @@ class volcanoPlotter:
 
         # Create background contour plot
         contour = plt.contourf(
-            self.xx,
-            self.yy,
+            self.x,
+            self.y,
             self.limiting_potential_mesh,
             levels=512,
             cmap="coolwarm",
@@ -442,11 +434,12 @@ class volcanoPlotter:
         # Add markers
         self.__add_markers(
             plt,
+            self.__find_apex(reaction_name),
             label_selection=label_selection,
         )
 
         # Add RDS separator
-        self.__add_rds_separator(plt)
+        self.__add_rds_separator(plt, reaction_name)
 
         # Save/show figure
         plt.tight_layout()
@@ -468,12 +461,9 @@ class volcanoPlotter:
             show (bool, optional): show plot after creation. Defaults to False.
 
         """
-        # Generate free energy change mesh for selected reaction
-        free_energy_change_mesh = self.__generate_free_energy_change_mesh(reaction_name)
-
-        # Generate RDS mesh
+        # Generate RDS mesh for selected reaction
         _, rds_mesh = self.__generate_limiting_potential_and_RDS_mesh(
-            free_energy_change_mesh, show_best=False
+            reaction_name, show_best=False
         )
         rds_mesh += 1  # reaction step index starts from 1
 
@@ -503,8 +493,8 @@ class volcanoPlotter:
         norm = plt.Normalize(vmin=1, vmax=len(colors) + 1)
 
         contour = plt.contourf(
-            self.xx,
-            self.yy,
+            self.x,
+            self.y,
             rds_mesh,
             levels=10,
             cmap=cmap,
@@ -513,6 +503,7 @@ class volcanoPlotter:
         # Add discrete colorbar
         cbar = plt.colorbar(
             plt.cm.ScalarMappable(norm=norm, cmap=cmap),
+            ax=plt.gca(),
         )
 
         tick_positions = np.linspace(1 + 0.5, len(colors) + 0.5, len(colors))
@@ -549,20 +540,12 @@ class volcanoPlotter:
         Notes:
             1. The selectivity mesh is calculated as the (UL_main - UL_competing), where the UL is the limiting potential in eV. This means "more positive value in the volcano plot indicates better selectivity".
         """
-        # Generate free energy change mesh for main and competing reactions
-        free_energy_change_mesh_main = self.__generate_free_energy_change_mesh(
-            reaction_names["main"]
-        )
-        free_energy_change_mesh_comp = self.__generate_free_energy_change_mesh(
-            reaction_names["comp"]
-        )
-
-        # Generate limiting potential mesh for each reaction
+        # Generate limiting potential mesh for main and competing reactions
         lim_potential_mesh_main, _ = self.__generate_limiting_potential_and_RDS_mesh(
-            free_energy_change_mesh_main, show_best=False
+            reaction_names["main"], show_best=False
         )
         lim_potential_mesh_comp, _ = self.__generate_limiting_potential_and_RDS_mesh(
-            free_energy_change_mesh_comp, show_best=False
+            reaction_names["comp"], show_best=False
         )
 
         # Calculate selectivity mesh
@@ -584,8 +567,8 @@ class volcanoPlotter:
 
         # Create background contour plot
         contour = plt.contourf(
-            self.xx,
-            self.yy,
+            self.x,
+            self.y,
             selectivity_mesh,
             levels=512,
             cmap="coolwarm",
@@ -593,7 +576,7 @@ class volcanoPlotter:
         )
 
         # # Add limitint potential difference == 0 line
-        # contour_line = plt.contour(self.xx, self.yy, selectivity_mesh, levels=[0],
+        # contour_line = plt.contour(self.x, self.y, selectivity_mesh, levels=[0],
         #                            color="black", linestyle="-", linewidth=2,
         #                            )
         # plt.clabel(contour_line, fmt='%2.1d', colors='k', fontsize=14)  # contour line labels
@@ -610,9 +593,10 @@ class volcanoPlotter:
             hide_border=False,
         )
 
-        # Add markers
+        # Add markers (alpha centred on best catalysts of main reaction)
         self.__add_markers(
             plt,
+            self.__find_apex(reaction_names["main"]),
             label_selection=label_selection,
         )
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch DOS extraction over a whole calculation tree.
+Find every folder with POSCAR and vasprun.xml under root_dir and extract PDOS in parallel.
+"""
+
+
+root_dir = "."
+spin = "up"
+num_workers = 4
+skip_up_to_date = True
+extract_all_atoms = True  # write all-atom DOS "dos_{spin}.npy"
+atom_index = "centre"  # single atom DOS to extract (starts from 1), "centre" for centre_atoms, None to skip
+training_config = "../1-model-and-training/1-hyper-tune/config.yaml"
+
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+from pathlib import Path
+from tqdm import tqdm
+
+from extract_dos_from_vasprunxml import dos_extractor, get_total_atom
+from extract_single_atom_DOS import extract_DOS, get_centre_atom_index, load_centre_atoms
+
+
+def find_calculation_folders(root):
+    """Find all folders containing both POSCAR and vasprun.xml.
+
+    Args:
+        root (str): root directory to walk through.
+
+    Returns:
+        list: sorted list of folder paths (Path)
+
+    """
+    # Check args
+    assert os.path.isdir(root)
+
+    folders = []
+    for dirpath, _, filenames in os.walk(root):
+        if "POSCAR" in filenames and "vasprun.xml" in filenames:
+            folders.append(Path(dirpath))
+
+    return sorted(folders)
+
+
+def get_output_files(folder, spin, atom_index=None, extract_all_atoms=True):
+    """Compile list of DOS files to be generated for a folder.
+
+    Args:
+        folder (Path): calculation folder.
+        spin (str): extract spin "up", "down" or "both".
+        atom_index (int, optional): single atom index (starts from 1). Defaults to None.
+        extract_all_atoms (bool, optional): all-atom DOS would be generated. Defaults to True.
+
+    Returns:
+        list: list of output file paths (Path)
+
+    """
+    spins = ("up", "down") if spin == "both" else (spin, )
+
+    files = [folder / f"dos_{s}.npy" for s in spins] if extract_all_atoms else []
+    if atom_index is not None:
+        files.extend(folder / f"dos_{s}_{atom_index}.npy" for s in spins)
+
+    return files
+
+
+def is_up_to_date(folder, spin, atom_index=None, extract_all_atoms=True):
+    """Check if all DOS files exist and are newer than POSCAR and vasprun.xml.
+
+    Args:
+        folder (Path): calculation folder.
+        spin (str): extract spin "up", "down" or "both".
+        atom_index (int, optional): single atom index (starts from 1). Defaults to None.
+        extract_all_atoms (bool, optional): all-atom DOS would be generated. Defaults to True.
+
+    Returns:
+        bool: True if extraction could be skipped
+
+    """
+    source_mtime = max(os.path.getmtime(folder / i) for i in ("POSCAR", "vasprun.xml"))
+
+    for file in get_output_files(folder, spin, atom_index, extract_all_atoms):
+        if not file.exists() or os.path.getmtime(file) < source_mtime:
+            return False
+
+    return True
+
+
+def extract_folder(folder, spin, atom_index=None, extract_all_atoms=True):
+    """Extract DOS for one folder (worker function).
+
+    Args:
+        folder (Path): calculation folder.
+        spin (str): extract spin "up", "down" or "both".
+        atom_index (int, optional): single atom index (starts from 1). Defaults to None.
+        extract_all_atoms (bool, optional): write all-atom DOS. Defaults to True.
+
+    Returns:
+        tuple: (folder, error message or None)
+
+    """
+    try:
+        # Extract DOS of all atoms
+        if extract_all_atoms:
+            atom_num = get_total_atom(str(folder / "POSCAR"))
+            dos_extractor(str(folder), spin=spin, num_atoms=atom_num)
+
+        # Extract single atom DOS (sliced from all-atom DOS if available, or parsed from vasprun.xml)
+        if atom_index is not None:
+            extract_DOS(source_dir=folder, atom_index=atom_index, spin=spin)
+
+    except Exception as e:  # report failure instead of stopping the whole batch
+        return folder, f"{type(e).__name__}: {e}"
+
+    return folder, None
+
+
+def batch_extract(root, spin, num_workers=4, skip_up_to_date=True, atom_index=None, centre_atoms=None, extract_all_atoms=True):
+    """Extract DOS for all calculation folders under root in a process pool.
+
+    Args:
+        root (str): root directory to walk through.
+        spin (str): extract spin "up", "down" or "both".
+        num_workers (int, optional): number of worker processes. Defaults to 4.
+        skip_up_to_date (bool, optional): skip folders whose DOS files are newer than sources. Defaults to True.
+        atom_index (int, str, optional): also extract single atom DOS (starts from 1),
+            "centre" to take index from centre_atoms. Defaults to None.
+        centre_atoms (dict, optional): centre atom index dict, key is substrate. Defaults to None.
+        extract_all_atoms (bool, optional): write all-atom DOS. Defaults to True.
+
+    Returns:
+        dict: failed folders, key is folder path, value is error message
+
+    Notes:
+        1. Folders are expected in "{substrate}/{adsorbate}_{state}/{folder}" format for "centre" mode.
+
+    """
+    # Check args
+    assert spin in {"up", "down", "both"}
+    assert isinstance(num_workers, int) and num_workers >= 1
+    assert atom_index in {None, "centre"} or (isinstance(atom_index, int) and atom_index >= 1)
+    assert atom_index != "centre" or isinstance(centre_atoms, dict)
+    assert extract_all_atoms or atom_index is not None
+
+    # Resolve single atom index for each folder
+    folders = find_calculation_folders(root)
+    failures = {}
+    atom_indices = {}
+    for folder in folders:
+        try:
+            atom_indices[folder] = get_centre_atom_index(folder, centre_atoms) if atom_index == "centre" else atom_index
+        except (KeyError, IndexError) as e:
+            failures[folder] = f"{type(e).__name__}: {e}"
+    folders = [f for f in folders if f in atom_indices]
+
+    # Filter out up-to-date folders
+    if skip_up_to_date:
+        pending = [f for f in folders if not is_up_to_date(f, spin, atom_indices[f], extract_all_atoms)]
+    else:
+        pending = folders
+    print(f"{len(folders) + len(failures)} calculation folders found, {len(folders) - len(pending)} up-to-date skipped.")
+
+    # Run extraction in process pool
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(extract_folder, f, spin, atom_indices[f], extract_all_atoms) for f in pending]
+
+        num_succeeded = 0
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Extracting DOS"):
+            folder, error = future.result()
+            if error is None:
+                num_succeeded += 1
+            else:
+                failures[folder] = error
+
+    # Print summary
+    print(f"Extraction finished: {num_succeeded} succeeded, {len(failures)} failed.")
+    for folder, error in failures.items():
+        print(f"Failed: \"{folder}\" ({error})")
+
+    return failures
+
+
+if __name__ == "__main__":
+    # Load centre atom indexes from training config
+    centre_atoms = load_centre_atoms(training_config) if atom_index == "centre" else None
+
+    batch_extract(root_dir, spin=spin, num_workers=num_workers,
+                  skip_up_to_date=skip_up_to_date, atom_index=atom_index,
+                  centre_atoms=centre_atoms, extract_all_atoms=extract_all_atoms)
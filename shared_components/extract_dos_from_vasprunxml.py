@@ -38,91 +38,153 @@ def get_total_atom(poscarfile):
     return sum(atom_num_line)
 
 
-def dos_extractor(folder, spin):
-    """Extractor DOS from vasprun.xml from given folder.
+def iter_partial_dos(file, spins=("up", "down"), atom_indices=None):
+    """Stream PDOS of each atom from the "dos/partial" block of vasprun.xml.
 
     Args:
-        folder (str): name of folder to work on.
-        spin (str): extract spin "up", "down" or "both".
+        file (str): path to vasprun.xml.
+        spins (tuple, optional): spin channels to parse, "up" and/or "down". Defaults to ("up", "down").
+        atom_indices (set, optional): atoms to parse (starts from 1). Defaults to None (all atoms).
+
+    Yields:
+        tuple: (atom_index, spin, dos), atom_index starts from 1, dos is np.ndarray in shape (NEDOS, numColumns)
+
+    Raises:
+        ValueError: if the calculation is not spin polarised (ISPIN = 1).
+
+    Notes:
+        1. vasprun.xml is parsed incrementally and every element is dropped from the tree once closed,
+            so peak memory is bounded by the PDOS of one atom rather than the whole file.
+        2. Rows of each atom/spin block are converted to float in one np.fromstring call.
+        3. Parsing stops at the end of the "dos/partial" block (the rest of the file is never read),
+            or as soon as all requested atoms are parsed.
 
     """
+    # Check args
+    for s in spins:
+        assert s in {"up", "down"}
+    assert os.path.exists(file)
+    if atom_indices is not None:
+        atom_indices = set(atom_indices)
+        for index in atom_indices:
+            assert isinstance(index, int) and index >= 1
+        remaining = {(index, s) for index in atom_indices for s in spins}
 
-    def read_ispin_from_vaspxml(vasprunxml_root):
-        """Read ISPIN tag value from vasprun.xml.
+    spin_comments = {"spin 1": "up", "spin 2": "down"}
 
-        Returns:
-            str: ISPIN tag in value either "1" or "2"
+    from xml.etree import ElementTree
 
-        """
-        # Get ISPIN value
-        index = 0
-        for child in dos_root[1]:
-            # locate ISPIN tag position
-            if dos_root[1][index].attrib["name"] == "ISPIN":
-                break
-            else:
-                index += 1
+    ispin = None
+    in_partial = False
+    current_ion = None
+    current_spin = None
+    rows = []
+
+    elements = []  # currently open elements, from root to the latest one
+    for event, elem in ElementTree.iterparse(file, events=("start", "end")):
+        if event == "start":
+            # Check ISPIN before entering PDOS block
+            if elem.tag == "partial" and elements and elements[-1].tag == "dos":
+                if ispin != "2":
+                    raise ValueError("None spin polarised analysis currently not supported!")
+                in_partial = True
+
+            # Locate ion and spin sets (attributes are available at start event)
+            elif in_partial and elem.tag == "set":
+                comment = elem.attrib.get("comment", "")
+                if comment.startswith("ion "):
+                    current_ion = int(comment.split()[-1])
+                elif comment in spin_comments:
+                    current_spin = spin_comments[comment]
+
+            elements.append(elem)
+            continue
+
+        # End event: element (and its text) is complete
+        elements.pop()
+
+        # Read ISPIN tag ("parameters" entry comes after "incar" and takes priority)
+        if elem.tag == "i" and elem.attrib.get("name") == "ISPIN":
+            ispin = elem.text.strip()
+            assert ispin in {"1", "2"}
+
+        elif in_partial:
+            selected = current_spin in spins and (atom_indices is None or current_ion in atom_indices)
+
+            if elem.tag == "r":
+                if selected:
+                    rows.append(elem.text)
+
+            elif elem.tag == "set" and elem.attrib.get("comment") in spin_comments:
+                if selected:
+                    # Convert all rows of current atom/spin in one call
+                    num_columns = len(rows[0].split())
+                    dos = np.fromstring(" ".join(rows), sep=" ").reshape(len(rows), num_columns)
+                    yield current_ion, current_spin, dos
+
+                    # Stop once all requested atoms are parsed
+                    if atom_indices is not None:
+                        remaining.discard((current_ion, current_spin))
+                        if not remaining:
+                            return
+                rows = []
+                current_spin = None
+
+            elif elem.tag == "set" and elem.attrib.get("comment", "").startswith("ion "):
+                current_ion = None
+
+            elif elem.tag == "partial":
+                return
+
+        # Drop finished element from its parent to keep memory bounded
+        if elements:
+            elements[-1].remove(elem)
+
+    raise ValueError(f"Cannot find PDOS in {file}, check LORBIT tag.")
+
+
+def dos_extractor(folder, spin, num_atoms=None):
+    """Extractor DOS from vasprun.xml from given folder.
 
-        ispin = dos_root[1][index].text.strip()
+    Args:
+        folder (str): name of folder to work on.
+        spin (str): extract spin "up", "down" or "both".
+        num_atoms (int, optional): total number of atoms. Defaults to None (read from POSCAR).
 
-        assert ispin in {"1", "2"}
-        return ispin
+    Notes:
+        1. PDOS is streamed with iter_partial_dos and written into preallocated arrays,
+            written to "dos_up.npy"/"dos_down.npy" in shape (numAtoms, NEDOS, numColumns).
 
+    """
     # Check args
     assert spin in {"up", "down", "both"}
     assert os.path.exists(os.path.join(folder, "vasprun.xml"))
 
+    # Get total number of atoms from POSCAR
+    if num_atoms is None:
+        num_atoms = get_total_atom(os.path.join(folder, "POSCAR"))
+    assert isinstance(num_atoms, int) and num_atoms >= 1
+
     # Get vasprun.xml filename
     file = os.path.join(folder, "vasprun.xml")
 
-    # Import vasprun.xml
-    from xml.etree import ElementTree
-    dos_tree = ElementTree.parse(file)
-    dos_root = dos_tree.getroot()
-
-    # Decide if spin polarized from "ISPIN" tag
-    ispin = read_ispin_from_vaspxml(dos_root)
-
-    # Begin to export DOS data from vasprun.xml
-    if ispin == "1":
-        return ValueError("None spin polarised analysis currently not supported!")
+    # Stream PDOS into preallocated arrays
+    spins = ("up", "down") if spin == "both" else (spin, )
+    dos_arrays = {}
+    for atom_index, atom_spin, dos in iter_partial_dos(file, spins=spins):
+        if atom_index > num_atoms:
+            raise ValueError(f"Atom index {atom_index} exceeds total number of atoms {num_atoms}.")
 
-    else:  # ISPIN = 2
-        # create empty list
-        dos_up = []
-        dos_down = []
-
-        # find dos data position
-        for atom in dos_root[8][-2][-1][0][-1]:  # 8-calculation; -2-dos; -1-partial; 0-array; -1-set
-            # Spin up
-            spin_up_dos = [i.text.strip() for i in atom[0]]
-            ## Convert each line to np array
-            spin_up_dos = np.array([[float(j) for j in i.split()] for i in spin_up_dos])
-
-            # Spin down
-            spin_down_dos = [i.text.strip() for i in atom[1]]
-            ## Convert each line to np array
-            spin_down_dos = np.array([[float(j) for j in i.split()] for i in spin_down_dos])
-
-            # Append DOS data to list
-            dos_up.append(spin_up_dos)
-            dos_down.append(spin_down_dos)
-
-        # Stack dos arrays
-        dos_up = np.array(dos_up)
-        dos_down = np.array(dos_down)
+        if atom_spin not in dos_arrays:
+            dos_arrays[atom_spin] = np.zeros((num_atoms, *dos.shape))
+        dos_arrays[atom_spin][atom_index - 1] = dos
 
     # Write DOS to numpy array
-    if ispin == "1":
-        return ValueError("None spin polarised analysis currently not supported!")  # DEBUG
-
-    else:  # ISPIN = 2
-        if spin in {"up", "both"}:
-            # write spin up as "dos_up.npy"
-            np.save(os.path.join(folder, "dos_up.npy"), dos_up)
-        if spin in {"down", "both"}:
-            # write spin down as "dos_down.npy"
-            np.save(os.path.join(folder, "dos_down.npy"), dos_down)
+    for s in spins:
+        if s not in dos_arrays:
+            raise ValueError(f"Spin {s} DOS not found in {file}.")
+        # write spin up as "dos_up.npy", spin down as "dos_down.npy"
+        np.save(os.path.join(folder, f"dos_{s}.npy"), dos_arrays[s])
 
 
 if __name__ == "__main__":
@@ -132,7 +194,7 @@ if __name__ == "__main__":
         atom_num = get_total_atom(os.path.join(working_dir, "POSCAR"))
 
         # Run DOS extractor
-        dos_extractor(working_dir, spin=spin)
+        dos_extractor(working_dir, spin=spin, num_atoms=atom_num)
 
     else:
         print(f"POSCAR or vasprun.xml not found in \"{working_dir}\"")
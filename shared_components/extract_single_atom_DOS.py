@@ -4,40 +4,101 @@
 
 spin = "up"
 working_dir = "."
+use_centre_atoms = True  # take atom index from centre_atoms of training config, or ask user
+training_config = "../1-model-and-training/1-hyper-tune/config.yaml"
 
 
 import numpy as np
 import os
 from pathlib import Path
+import yaml
+
+from extract_dos_from_vasprunxml import iter_partial_dos
+
+
+def get_centre_atom_index(source_dir, centre_atoms):
+    """Get centre atom index from path in "{substrate}/{adsorbate}_{state}/{folder}" format.
+
+    Args:
+        source_dir (Path): calculation folder.
+        centre_atoms (dict): centre atom index dict, key is substrate (index starts from 1)
+
+    Returns:
+        int: centre atom index (starts from 1)
+
+    """
+    # Get substrate name from path (augmented substrate ends with "_aug")
+    substrate = Path(source_dir).resolve().parts[-3].replace("_aug", "")
+
+    if substrate not in centre_atoms:
+        raise KeyError(f"Cannot find centre atom index for substrate \"{substrate}\".")
+
+    return centre_atoms[substrate]
+
+
+def load_centre_atoms(config_file):
+    """Load centre atom index dict from training config.yaml.
+
+    Args:
+        config_file (str): path to training config.yaml.
+
+    Returns:
+        dict: centre atom index dict, key is substrate (index starts from 1)
+
+    """
+    with open(config_file, encoding="utf-8") as ymlfile:
+        cfg = yaml.safe_load(ymlfile)
+
+    return cfg["species"]["centre_atoms"]
 
 
 def extract_DOS(source_dir, atom_index, spin="up"):
+    """Extract spd DOS of a single atom as "dos_{spin}_{atom_index}.npy".
+
+    Args:
+        source_dir (Path): calculation folder.
+        atom_index (int): index of atom to extract (starts from 1).
+        spin (str, optional): extract spin "up", "down" or "both". Defaults to "up".
+
+    Notes:
+        1. If all-atom DOS "dos_{spin}.npy" exists, it is memory-mapped and only the selected atom is read.
+        2. Otherwise only the selected atom is parsed from vasprun.xml (all-atom DOS is not written).
+
+    """
     # Check args
     assert spin in {"up", "down", "both"}
     assert isinstance(atom_index, int) and atom_index >= 1
+    source_dir = Path(source_dir)
 
+    spins = ("up", "down") if spin == "both" else (spin, )
 
-    # Load spin up DOS
-    if spin in {"up", "both"}:
-        # Load source DOS array
-        source_arr = np.load(source_dir / "dos_up.npy")
+    # Parse selected atom from vasprun.xml for spins without all-atom DOS
+    missing_spins = tuple(s for s in spins if not (source_dir / f"dos_{s}.npy").exists())
+    if missing_spins:
+        parsed = set()  # (atom_index, spin) pairs yielded by the parser
+        for parsed_index, atom_spin, dos in iter_partial_dos(source_dir / "vasprun.xml", spins=missing_spins, atom_indices={atom_index, }):
+            # Write selected atom DOS (spd only)
+            np.save((source_dir / f"dos_{atom_spin}_{atom_index}.npy"), dos[:, 1:10])
+            parsed.add((parsed_index, atom_spin))
 
-        # Extract selected atom DOS (spd only)
-        target_arr = source_arr[atom_index - 1, :, 1:10]
+        ## Check parsed pairs (not output files, which could be left from an earlier run)
+        for s in missing_spins:
+            if (atom_index, s) not in parsed:
+                raise ValueError(f"Spin {s} DOS of atom {atom_index} not found in {source_dir / 'vasprun.xml'}.")
 
-        # Write new DOS array
-        np.save((source_dir / f"dos_up_{atom_index}.npy"), target_arr)
+    # Slice memory-mapped all-atom DOS
+    for s in spins:
+        if s in missing_spins:
+            continue
 
-    # Load spin down DOS
-    if spin in {"down", "both"}:
         # Load source DOS array
-        source_arr = np.load(source_dir / "dos_down.npy")
+        source_arr = np.load(source_dir / f"dos_{s}.npy", mmap_mode="r")
 
         # Extract selected atom DOS (spd only)
-        target_arr = source_arr[atom_index - 1, :, 1:10]
+        target_arr = np.array(source_arr[atom_index - 1, :, 1:10])
 
         # Write new DOS array
-        np.save((source_dir / f"dos_down_{atom_index}.npy"), target_arr)
+        np.save((source_dir / f"dos_{s}_{atom_index}.npy"), target_arr)
 
 
 if __name__ == "__main__":
@@ -45,11 +106,13 @@ if __name__ == "__main__":
     working_dir = Path(working_dir)
     assert os.path.isdir(working_dir)
 
-    # Get atom index from user (starts from 1)
-    atom_index = int(input("Which atom to extract (starts from 1)?"))
+    # Get atom index from centre atoms or user (starts from 1)
+    if use_centre_atoms:
+        atom_index = get_centre_atom_index(working_dir, load_centre_atoms(training_config))
+    else:
+        atom_index = int(input("Which atom to extract (starts from 1)?"))
 
-    # Loop through folders in working dir
-    if (working_dir / f"dos_{spin}.npy").exists():
-        # Extract DOS
+    # Extract DOS from all-atom DOS or vasprun.xml
+    if (working_dir / f"dos_{spin}.npy").exists() or (working_dir / "vasprun.xml").exists():
         extract_DOS(source_dir=working_dir,
-                      atom_index=atom_index, spin=spin)
+                    atom_index=atom_index, spin=spin)
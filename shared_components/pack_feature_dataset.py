@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pack per-folder DOS files "dos_{spin}_{index}.npy" of the whole dataset
+into a single memory-mappable array with a key index (see Dataset.load_packed_feature).
+"""
+
+
+training_dir = "../1-model-and-training/1-hyper-tune"  # paths in its config.yaml are relative to it
+
+
+import numpy as np
+from pathlib import Path
+import yaml
+
+import sys
+sys.path.append(training_dir)
+from lib.dataset import Dataset
+
+
+if __name__ == "__main__":
+    # Load configs
+    with open(Path(training_dir) / "config.yaml") as ymlfile:
+        cfg = yaml.safe_load(ymlfile)
+
+    ## paths
+    feature_dir = Path(training_dir) / cfg["path"]["feature_dir"]
+    packed_dir = Path(training_dir) / cfg["path"]["packed_feature_dir"]
+    ## species
+    substrates = list(cfg["species"]["substrates"])  # load_feature extends it with augmentations
+    adsorbates = cfg["species"]["adsorbates"]
+    centre_atoms = cfg["species"]["centre_atoms"]
+    load_augmentation = cfg["species"]["load_augmentation"]
+    augmentations = cfg["species"]["augmentations"]
+    spin = cfg["species"]["spin"]
+    states = cfg["species"]["states"]
+
+
+    # Load raw dataset (ghost state removal applied at loading from packed dataset)
+    dataFetcher = Dataset()
+    dataFetcher.load_feature(feature_dir,
+                             substrates, adsorbates,
+                             centre_atoms,
+                             states=states,
+                             spin=spin,
+                             load_augment=load_augmentation, augmentations=augmentations,
+                             remove_ghost=False)
+
+    # Write packed dataset
+    dataFetcher.save_packed_feature(packed_dir, spin=spin)
+    print(f"A total of {dataFetcher.numFeature} samples packed into \"{packed_dir}\".")
+
+    # Check packed dataset
+    packedFetcher = Dataset()
+    packedFetcher.load_packed_feature(packed_dir,
+                                      list(cfg["species"]["substrates"]), adsorbates, centre_atoms,
+                                      states=states,
+                                      spin=spin,
+                                      load_augment=load_augmentation, augmentations=augmentations)
+    assert packedFetcher.numFeature == dataFetcher.numFeature
+    for key, arr in dataFetcher.feature.items():
+        assert np.array_equal(packedFetcher.feature[key], arr)
@@ -7,13 +7,14 @@ from pathlib import Path
 
 class CNNPredictor:
 
-    def __init__(self, model_path=None, loaded_model=None):
+    def __init__(self, model_path=None, loaded_model=None, use_compiled=True):
         """
         Initialize the CNNPredictor class.
 
         Args:
             model_path (str, optional): The file path to the saved Keras model.
             loaded_model (tf.keras.Model, optional): An already loaded Keras model.
+            use_compiled (bool, optional): Run inference through a traced tf.function instead of model.predict. Defaults to True.
 
         Raises:
             ValueError: If both model_path and loaded_model are provided.
@@ -33,6 +34,63 @@ class CNNPredictor:
         else:
             raise ValueError("Either model_path or loaded_model should be provided.")
 
+        # Trace inference function once with fixed input signature, then warm up
+        self.use_compiled = use_compiled
+        if use_compiled:
+            self._compiled_model = tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[tf.TensorSpec(shape=self.model.input_shape, dtype=tf.float32)],
+            )
+            self._compiled_model(tf.zeros((1, *self.model.input_shape[1:]), dtype=tf.float32))
+
+        # Per-branch sub-models and master head, built on first use
+        self._branch_models = None
+        self._head_model = None
+
+    def _run_model(self, input_array: np.ndarray) -> np.ndarray:
+        """
+        Run the CNN model on a batch of combined arrays.
+
+        Args:
+            input_array (np.ndarray): The combined array of shape (batch, numSamplings, numOrbitals, numChannels).
+
+        Returns:
+            np.ndarray: The flattened prediction array.
+        """
+
+        if self.use_compiled:
+            return self._compiled_model(tf.convert_to_tensor(input_array, dtype=tf.float32)).numpy().flatten()
+
+        return self.model.predict(input_array, batch_size=input_array.shape[0], verbose=0).flatten()
+
+    def _split_branches(self) -> None:
+        """
+        Split the model into per-orbital branch sub-models and the master head.
+
+        Layers of each branch are replayed on a new input of shape (numSamplings, numChannels),
+        and layers after the Concatenate layer on a new input of shape (numOrbitals, ).
+        Weights are shared with the full model.
+        """
+
+        def replay_chain(chain, input_shape):
+            """Apply layers of a chain to a new input, and wrap as a compiled inference function."""
+            chain_input = tf.keras.Input(shape=input_shape)
+            output = chain_input
+            for layer in chain:
+                output = layer(output)
+            sub_model = tf.keras.Model(inputs=chain_input, outputs=output)
+
+            return tf.function(
+                lambda x: sub_model(x, training=False),
+                input_signature=[tf.TensorSpec(shape=(None, *input_shape), dtype=tf.float32)],
+            )
+
+        numSamplings, numOrbitals, numChannels = self.model.input_shape[1:]
+        branch_chains, head_chain = split_branch_layers(self.model)
+
+        self._branch_models = [replay_chain(chain, (numSamplings, numChannels)) for chain in branch_chains]
+        self._head_model = replay_chain(head_chain, (numOrbitals, ))
+
     def predict(self, dos_array: np.ndarray, adsorbate_dos_array: np.ndarray) -> np.ndarray:
         """
         Make predictions based on the DOS and adsorbate DOS arrays.
@@ -59,6 +117,151 @@ class CNNPredictor:
         combined_array = np.concatenate([dos_array, adsorbate_dos_array], axis=-1)
 
         # Make predictions with CNN model
-        predictions = self.model.predict(np.expand_dims(combined_array, axis=0), verbose=0).flatten()
+        predictions = self._run_model(np.expand_dims(combined_array, axis=0))
+
+        return predictions
+
+    def predict_batch(self, dos_arrays: np.ndarray, adsorbate_dos_array: np.ndarray, batch_size: int = 256, perturbed_orbitals: list = None) -> np.ndarray:
+        """
+        Make predictions for a stack of DOS arrays sharing the same adsorbate DOS.
+
+        Args:
+            dos_arrays (np.ndarray): The processed DOS arrays of shape (N, numSamplings, numOrbitals, 1).
+            adsorbate_dos_array (np.ndarray): The processed adsorbate DOS array of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+            batch_size (int, optional): Number of samples per model call. Defaults to 256.
+            perturbed_orbitals (list, optional): Indices of the only orbitals that differ between DOS arrays.
+                If given, outputs of the other branches are computed once from the first DOS array
+                and cached, and only the perturbed branches are run per sample. Defaults to None.
+
+        Returns:
+            np.ndarray: The prediction array of shape (N, ).
+
+        Raises:
+            ValueError: If the shapes of the arrays are not as expected.
+
+        Notes:
+            The adsorbate DOS is broadcast into a combined buffer of at most batch_size samples,
+            so memory use does not grow with N.
+        """
+
+        # Check args
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size should be a positive integer.")
+
+        # Check shapes
+        if dos_arrays.ndim != 4 or dos_arrays.shape[-1] != 1:
+            raise ValueError("DOS arrays must be of shape (N, numSamplings, numOrbitals, 1).")
+
+        if dos_arrays.shape[1:-1] != adsorbate_dos_array.shape[:-1]:
+            raise ValueError("The shapes of dos_arrays and adsorbate_dos_array must match in numSamplings and numOrbitals.")
+
+        # Combined buffer reused across chunks, with adsorbate DOS broadcast in once
+        num_arrays = dos_arrays.shape[0]
+        buffer_size = min(batch_size, num_arrays)
+        combined_buffer = np.empty((buffer_size, *dos_arrays.shape[1:-1], 1 + adsorbate_dos_array.shape[-1]), dtype=np.float32)
+        combined_buffer[..., 1:] = adsorbate_dos_array
+
+        if perturbed_orbitals is not None:
+            return self._predict_perturbed_batch(dos_arrays, combined_buffer, list(perturbed_orbitals), batch_size)
+
+        predictions = np.empty(num_arrays, dtype=np.float32)
+        for start in range(0, num_arrays, batch_size):
+            stop = min(start + batch_size, num_arrays)
+            combined_array = combined_buffer[:stop - start]
+            combined_array[..., :1] = dos_arrays[start:stop]
+
+            predictions[start:stop] = self._run_model(combined_array)
 
         return predictions
+
+    def _predict_perturbed_batch(self, dos_arrays: np.ndarray, combined_buffer: np.ndarray, perturbed_orbitals: list, batch_size: int) -> np.ndarray:
+        """
+        Make predictions with cached outputs of unperturbed branches.
+
+        Args:
+            dos_arrays (np.ndarray): The processed DOS arrays of shape (N, numSamplings, numOrbitals, 1).
+            combined_buffer (np.ndarray): Combined buffer with adsorbate DOS broadcast in, of shape (buffer_size, numSamplings, numOrbitals, numChannels).
+            perturbed_orbitals (list): Indices of the only orbitals that differ between DOS arrays.
+            batch_size (int): Number of samples per model call.
+
+        Returns:
+            np.ndarray: The prediction array of shape (N, ).
+
+        Raises:
+            ValueError: If orbital indices are not valid.
+        """
+
+        if self._branch_models is None:
+            self._split_branches()
+
+        num_orbitals = len(self._branch_models)
+        if not perturbed_orbitals or not all(0 <= i < num_orbitals for i in perturbed_orbitals):
+            raise ValueError(f"perturbed_orbitals should be a non-empty list of indices in [0, {num_orbitals}).")
+
+        # Cache outputs of all branches from the first DOS array
+        combined_buffer[:1, ..., :1] = dos_arrays[:1]
+        cached_outputs = np.array(
+            [float(branch_model(combined_buffer[:1, :, i])[0, 0]) for i, branch_model in enumerate(self._branch_models)],
+            dtype=np.float32,
+        )
+
+        num_arrays = dos_arrays.shape[0]
+        branch_outputs = np.empty((min(batch_size, num_arrays), num_orbitals), dtype=np.float32)
+        branch_outputs[:] = cached_outputs
+
+        predictions = np.empty(num_arrays, dtype=np.float32)
+        for start in range(0, num_arrays, batch_size):
+            stop = min(start + batch_size, num_arrays)
+            combined_array = combined_buffer[:stop - start]
+            combined_array[..., :1] = dos_arrays[start:stop]
+
+            # Recompute perturbed branches only
+            for i in perturbed_orbitals:
+                branch_outputs[:stop - start, i] = self._branch_models[i](combined_array[:, :, i]).numpy()[:, 0]
+
+            predictions[start:stop] = self._head_model(branch_outputs[:stop - start]).numpy().flatten()
+
+        return predictions
+
+
+def split_branch_layers(model: tf.keras.Model) -> tuple:
+    """
+    Split layers of a multi-branch CNN into per-orbital branch chains and the master head chain.
+
+    Every branch is a single chain of layers from a slice of the master input
+    (master_input[:, :, i]) to one input of the Concatenate layer, and the master
+    head is a single chain of layers from the Concatenate layer to the model output.
+
+    Args:
+        model (tf.keras.Model): The multi-branch CNN model.
+
+    Returns:
+        tuple: List of branch layer chains (excluding the input slicing op, assumed in orbital order),
+        and the head layer chain (excluding the Concatenate layer), layers in call order.
+
+    Raises:
+        ValueError: If the model does not have one Concatenate layer joining one single-chain branch per orbital.
+    """
+
+    def collect_chain(tensor, stop_tensor):
+        """Collect single-input layers from stop_tensor (exclusive) to tensor, in call order."""
+        chain = []
+        while tensor is not stop_tensor:
+            layer = tensor._keras_history.layer
+            if isinstance(layer, tf.keras.layers.InputLayer) or isinstance(layer.input, (list, tuple)):
+                raise ValueError(f"Layer {layer.name} is not part of a single-input layer chain.")
+            chain.append(layer)
+            tensor = layer.input
+
+        return chain[::-1]
+
+    concat_layers = [layer for layer in model.layers if isinstance(layer, tf.keras.layers.Concatenate)]
+    numOrbitals = model.input_shape[2]
+    if len(concat_layers) != 1 or len(concat_layers[0].input) != numOrbitals:
+        raise ValueError("Model should have one Concatenate layer joining one branch per orbital.")
+    concat_layer = concat_layers[0]
+
+    branch_chains = [collect_chain(branch_output, model.input)[1:] for branch_output in concat_layer.input]
+    head_chain = collect_chain(model.output, concat_layer.output)
+
+    return branch_chains, head_chain
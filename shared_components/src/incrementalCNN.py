@@ -0,0 +1,380 @@
+#!/bin/usr/python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import tensorflow as tf
+
+from cnnPredictor import split_branch_layers
+
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+}
+
+
+class IncrementalCNN:
+
+    def __init__(self, model: tf.keras.Model, dos_array: np.ndarray, adsorbate_dos_array: np.ndarray):
+        """
+        Incremental inference engine for local perturbations of a reference DOS.
+
+        Conv/pooling activations of every branch are cached for the reference
+        DOS. A perturbation of samplings [lo, hi) of one orbital only changes
+        activations inside its receptive field, so each conv/pooling layer
+        recomputes a short patch, and the first Dense layer after Flatten is
+        updated with the (patch length x numFilters) rows it touches. Unperturbed
+        branch outputs are reused by the master head.
+
+        Args:
+            model (tf.keras.Model): The multi-branch CNN model (CNN4DOS architecture).
+            dos_array (np.ndarray): The reference DOS array of shape (numSamplings, numOrbitals, 1).
+            adsorbate_dos_array (np.ndarray): The adsorbate DOS array of shape (numSamplings, numOrbitals, max_adsorbate_channels).
+
+        Raises:
+            ValueError: If the shapes of the arrays are not as expected, or the model has unsupported layers.
+
+        Notes:
+            Supported branch layers are Reshape to (numSamplings, 1, numChannels), Conv2D with (k, 1)
+            kernels, AveragePooling2D/MaxPooling2D with (p, 1) pools, Dropout, Flatten and Dense.
+        """
+
+        # Check shapes
+        if dos_array.shape[-1] != 1:
+            raise ValueError("The last dimension (numChannels) of DOS array must be 1.")
+
+        if dos_array.shape[:-1] != adsorbate_dos_array.shape[:-1]:
+            raise ValueError("The shapes of dos_array and adsorbate_dos_array must match in the first two dimensions.")
+
+        branch_chains, head_chain = split_branch_layers(model)
+        self.numSamplings = dos_array.shape[0]
+        self.stages, self.denses = zip(*[self._parse_branch(chain) for chain in branch_chains])
+        self.head = [self._parse_dense(layer) for layer in head_chain if not isinstance(layer, (tf.keras.layers.Flatten, tf.keras.layers.Dropout))]
+
+        # Cache reference activations of each branch
+        combined_array = np.concatenate([dos_array, adsorbate_dos_array], axis=-1).astype(np.float32)
+        self.reference_inputs = []  # zero-padded input of each stage
+        self.reference_outputs = []  # output of last stage
+        self.reference_dense = []  # first Dense layer pre-activation
+        branch_outputs = []
+        for i, stages in enumerate(self.stages):
+            padded_inputs, output = self._forward_reference(stages, combined_array[:, i])
+            self.reference_inputs.append(padded_inputs)
+            self.reference_outputs.append(output)
+
+            kernel, bias, _ = self.denses[i][0]
+            self.reference_dense.append(output.reshape(-1) @ kernel + bias)
+            branch_outputs.append(self._dense_chain(self.reference_dense[i][np.newaxis], self.denses[i])[0, 0])
+
+        self.reference_branch_outputs = np.array(branch_outputs, dtype=np.float32)
+        self.reference_prediction = float(self._dense_chain(self.reference_branch_outputs[np.newaxis], self.head, pre_activation=False)[0, 0])
+
+    @staticmethod
+    def _activation(layer) -> callable:
+        """Get numpy activation function of a Keras layer."""
+
+        name = tf.keras.activations.serialize(layer.activation)
+        name = name if isinstance(name, str) else name.get("config", {}).get("name", name.get("class_name"))
+        if name not in _ACTIVATIONS:
+            raise ValueError(f"Unsupported activation {name} in layer {layer.name}.")
+
+        return _ACTIVATIONS[name]
+
+    def _parse_dense(self, layer) -> tuple:
+        """Get (kernel, bias, activation) of a Dense layer."""
+
+        if not isinstance(layer, tf.keras.layers.Dense):
+            raise ValueError(f"Unsupported layer {layer.name} after Flatten.")
+
+        kernel, bias = (w.numpy() for w in layer.weights) if layer.use_bias else (layer.weights[0].numpy(), 0.0)
+
+        return kernel, bias, self._activation(layer)
+
+    def _parse_branch(self, chain) -> tuple:
+        """
+        Parse a branch layer chain into windowed stages and Dense layers.
+
+        Args:
+            chain (list): Branch layers in call order.
+
+        Returns:
+            tuple: List of stage dicts (kind, kernel_size, stride, pad_before, num_in, num_out, weights),
+            and list of Dense (kernel, bias, activation) after Flatten.
+
+        Raises:
+            ValueError: If the chain has unsupported layers.
+        """
+
+        stages, denses = [], []
+        num_in = self.numSamplings
+        flattened = False
+        for layer in chain:
+            if isinstance(layer, tf.keras.layers.Dropout):
+                continue
+
+            if flattened:
+                denses.append(self._parse_dense(layer))
+
+            elif isinstance(layer, tf.keras.layers.Reshape):
+                if tuple(layer.target_shape[:2]) != (self.numSamplings, 1):
+                    raise ValueError(f"Reshape layer {layer.name} should reshape to (numSamplings, 1, numChannels).")
+
+            elif isinstance(layer, tf.keras.layers.Flatten):
+                flattened = True
+
+            elif isinstance(layer, (tf.keras.layers.Conv2D, tf.keras.layers.AveragePooling2D, tf.keras.layers.MaxPooling2D)):
+                if isinstance(layer, tf.keras.layers.Conv2D):
+                    (kernel_size, width), (stride, _) = layer.kernel_size, layer.strides
+                    if tuple(layer.dilation_rate) != (1, 1) or layer.groups != 1:
+                        raise ValueError(f"Dilated or grouped Conv2D layer {layer.name} not supported.")
+                    kernel = layer.kernel.numpy()[:, 0]  # (k, numChannels, numFilters)
+                    weights = (kernel, layer.bias.numpy() if layer.use_bias else 0.0, self._activation(layer))
+                    kind = "conv"
+                else:
+                    (kernel_size, width), (stride, _) = layer.pool_size, layer.strides
+                    weights = None
+                    kind = "avg" if isinstance(layer, tf.keras.layers.AveragePooling2D) else "max"
+
+                if width != 1:
+                    raise ValueError(f"Layer {layer.name} should operate along numSamplings only.")
+
+                # TF padding: SAME pads (total) max((num_out - 1) * stride + k - num_in, 0), half before
+                if layer.padding == "same":
+                    num_out = -(-num_in // stride)
+                    pad_before = max((num_out - 1) * stride + kernel_size - num_in, 0) // 2
+                else:
+                    num_out = (num_in - kernel_size) // stride + 1
+                    pad_before = 0
+
+                stages.append({"kind": kind, "kernel_size": kernel_size, "stride": stride,
+                               "pad_before": pad_before, "num_in": num_in, "num_out": num_out,
+                               "weights": weights})
+                num_in = num_out
+
+            else:
+                raise ValueError(f"Unsupported layer {layer.name} ({type(layer).__name__}) in branch.")
+
+        if not stages or not denses:
+            raise ValueError("Branch should have Conv2D/pooling layers, followed by Flatten and Dense layers.")
+
+        return stages, denses
+
+    @staticmethod
+    def _apply_stage(stage, windows: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """
+        Apply a conv/pooling stage to windows of its (zero-padded) input.
+
+        Args:
+            stage (dict): The stage.
+            windows (np.ndarray): Input windows of shape (..., num_windows, kernel_size, numChannels).
+            valid (np.ndarray): Mask of real (not padded) samplings, shape (..., num_windows, kernel_size).
+
+        Returns:
+            np.ndarray: Stage output of shape (..., num_windows, numChannels_out).
+        """
+
+        if stage["kind"] == "conv":
+            kernel, bias, activation = stage["weights"]
+            return activation(np.einsum("...kc,kcf->...f", windows, kernel) + bias)
+
+        # Padded samplings are excluded from pooling (TF SAME padding)
+        if stage["kind"] == "avg":
+            return np.sum(windows, axis=-2) / np.sum(valid, axis=-1, keepdims=True)
+
+        return np.max(np.where(valid[..., np.newaxis], windows, -np.inf), axis=-2)
+
+    def _forward_reference(self, stages, branch_input: np.ndarray) -> tuple:
+        """
+        Run windowed stages of a branch on the full reference input.
+
+        Args:
+            stages (list): The stages of the branch.
+            branch_input (np.ndarray): Branch input of shape (numSamplings, numChannels).
+
+        Returns:
+            tuple: Zero-padded inputs of each stage (padded length (num_out - 1) * stride + kernel_size),
+            and output of the last stage of shape (num_out, numChannels_out).
+        """
+
+        padded_inputs = []
+        activation = branch_input
+        for stage in stages:
+            padded_length = (stage["num_out"] - 1) * stage["stride"] + stage["kernel_size"]
+            positions = np.arange(padded_length) - stage["pad_before"]
+            valid = (positions >= 0) & (positions < stage["num_in"])
+
+            padded = np.zeros((padded_length, activation.shape[-1]), dtype=np.float32)
+            padded[valid] = activation[positions[valid]]
+            padded_inputs.append(padded)
+
+            window_idx = np.arange(stage["num_out"])[:, np.newaxis] * stage["stride"] + np.arange(stage["kernel_size"])
+            activation = self._apply_stage(stage, padded[window_idx], valid[window_idx]).astype(np.float32)
+
+        return padded_inputs, activation
+
+    @staticmethod
+    def _dense_chain(x: np.ndarray, denses, pre_activation=True) -> np.ndarray:
+        """
+        Apply Dense layers.
+
+        Args:
+            x (np.ndarray): Input of shape (N, units), pre-activation of the first layer if pre_activation.
+            denses (list): Dense (kernel, bias, activation) in call order.
+            pre_activation (bool, optional): x is the pre-activation of the first Dense layer. Defaults to True.
+
+        Returns:
+            np.ndarray: Output of shape (N, units_out).
+        """
+
+        if pre_activation:
+            x = denses[0][2](x)
+            denses = denses[1:]
+
+        for kernel, bias, activation in denses:
+            x = activation(x @ kernel + bias)
+
+        return x
+
+    def predict_occlusions(self, orbital_index: int, lo: np.ndarray, hi: np.ndarray, values: np.ndarray = None) -> np.ndarray:
+        """
+        Make predictions with samplings [lo, hi) of one orbital replaced, one window per sample.
+
+        Args:
+            orbital_index (int): The perturbed orbital.
+            lo (np.ndarray): Lower (inclusive) sampling index of each window, shape (N, ).
+            hi (np.ndarray): Upper (exclusive) sampling index of each window, shape (N, ).
+            values (np.ndarray, optional): Replacement DOS values of shape (N, max(hi - lo)), aligned to lo. Defaults to zeros (occlusion).
+
+        Returns:
+            np.ndarray: The prediction array of shape (N, ).
+
+        Raises:
+            ValueError: If windows are not valid.
+        """
+
+        lo, hi = np.asarray(lo), np.asarray(hi)
+        if not 0 <= orbital_index < len(self.stages):
+            raise ValueError(f"orbital_index should be in [0, {len(self.stages)}).")
+        if lo.shape != hi.shape or lo.ndim != 1 or np.any(lo < 0) or np.any(hi > self.numSamplings) or np.any(hi <= lo):
+            raise ValueError("Windows should satisfy 0 <= lo < hi <= numSamplings.")
+
+        # Input patch of fixed length, starting at lo (shifted left at the upper edge)
+        patch_length = int(np.max(hi - lo))
+        starts = np.minimum(lo, self.numSamplings - patch_length)
+        positions = starts[:, np.newaxis] + np.arange(patch_length)
+
+        # Branch input patch (read from padded input of first stage), shape (N, patch_length, numChannels)
+        pad_before = self.stages[orbital_index][0]["pad_before"]
+        reference_patch = self.reference_inputs[orbital_index][0][positions + pad_before]
+        patch = reference_patch.copy()
+
+        replaced = (positions >= lo[:, np.newaxis]) & (positions < hi[:, np.newaxis])
+        if values is None:
+            patch[..., 0] = np.where(replaced, 0.0, patch[..., 0])
+        else:
+            values = np.asarray(values, dtype=np.float32)
+            aligned = np.take_along_axis(values, np.clip(positions - lo[:, np.newaxis], 0, values.shape[1] - 1), axis=1)
+            patch[..., 0] = np.where(replaced, aligned, patch[..., 0])
+
+        # Windows leaving the input unchanged (e.g. occluding zero DOS) give the reference prediction exactly
+        unchanged = np.all(patch == reference_patch, axis=(1, 2))
+
+        # Recompute the affected patch of each stage
+        for stage, padded_input in zip(self.stages[orbital_index], self.reference_inputs[orbital_index]):
+            patch, starts = self._forward_patch(stage, padded_input, patch, starts)
+
+        # Rank-limited update of first Dense layer (rows touched by the output patch)
+        kernel, _, _ = self.denses[orbital_index][0]
+        reference_output = self.reference_outputs[orbital_index]
+        rows = starts[:, np.newaxis] + np.arange(patch.shape[1])
+        delta = patch - reference_output[rows]
+        kernel = kernel.reshape(*reference_output.shape, -1)
+        dense = self.reference_dense[orbital_index] + np.einsum("nmf,nmfu->nu", delta, kernel[rows])
+
+        branch_outputs = np.repeat(self.reference_branch_outputs[np.newaxis], len(lo), axis=0)
+        branch_outputs[:, orbital_index] = self._dense_chain(dense, self.denses[orbital_index])[:, 0]
+
+        predictions = self._dense_chain(branch_outputs, self.head, pre_activation=False)[:, 0]
+        predictions[unchanged] = self.reference_prediction
+
+        return predictions
+
+    def _forward_patch(self, stage, padded_input: np.ndarray, patch: np.ndarray, starts: np.ndarray) -> tuple:
+        """
+        Recompute stage outputs whose receptive field overlaps the input patch.
+
+        Args:
+            stage (dict): The stage.
+            padded_input (np.ndarray): Zero-padded reference input of the stage.
+            patch (np.ndarray): Perturbed input patch of shape (N, patch_length, numChannels).
+            starts (np.ndarray): Start sampling of each input patch, shape (N, ).
+
+        Returns:
+            tuple: Output patch of shape (N, out_length, numChannels_out), and its start indices.
+        """
+
+        kernel_size, stride, pad_before = stage["kernel_size"], stage["stride"], stage["pad_before"]
+        patch_length = patch.shape[1]
+
+        # Outputs o read padded inputs [o * stride, o * stride + k), fixed count covering any alignment
+        out_length = min(stage["num_out"], (patch_length + kernel_size - 2) // stride + 1)
+        out_starts = -(-(starts + pad_before - kernel_size + 1) // stride)
+        out_starts = np.clip(out_starts, 0, stage["num_out"] - out_length)
+
+        # Gather reference input over the receptive field, overlaid with the patch
+        padded_positions = out_starts[:, np.newaxis] * stride + np.arange((out_length - 1) * stride + kernel_size)
+        relative = padded_positions - pad_before - starts[:, np.newaxis]
+        in_patch = (relative >= 0) & (relative < patch_length)
+        field = np.where(
+            in_patch[..., np.newaxis],
+            np.take_along_axis(patch, np.clip(relative, 0, patch_length - 1)[..., np.newaxis], axis=1),
+            padded_input[padded_positions],
+        )
+
+        valid = (padded_positions >= pad_before) & (padded_positions < pad_before + stage["num_in"])
+        window_idx = np.arange(out_length)[:, np.newaxis] * stride + np.arange(kernel_size)
+        output = self._apply_stage(stage, field[:, window_idx], valid[:, window_idx])
+
+        return output.astype(np.float32), out_starts
+
+
+if __name__ == "__main__":
+    # Self-check: compare incremental occlusion predictions with full model inference on a random CNN4DOS
+    import sys
+    from pathlib import Path
+
+    from cnnPredictor import CNNPredictor
+
+    sys.path.append(str((Path(__file__).parent / "../../1-model-and-training/1-hyper-tune").resolve()))
+    from lib.model import cnn_for_dos
+
+    numSamplings, numOrbitals, max_adsorbate_channels = 4000, 9, 5
+    tf.random.set_seed(0)
+    model = cnn_for_dos((numSamplings, numOrbitals, 1 + max_adsorbate_channels), drop_out_rate=0.2)
+    cnn_predictor = CNNPredictor(loaded_model=model)
+
+    rng = np.random.default_rng(0)
+    dos_array = rng.random((numSamplings, numOrbitals, 1)).astype(np.float32)
+    dos_array[2000:2100, 0] = 0.0
+    adsorbate_dos_array = rng.random((numSamplings, numOrbitals, max_adsorbate_channels)).astype(np.float32)
+    engine = IncrementalCNN(model, dos_array, adsorbate_dos_array)
+
+    # Windows at both edges, in the middle, of width 1 and covering all samplings
+    lo = np.array([0, 0, 1, numSamplings - 5, numSamplings - 1, 1000, 0])
+    hi = np.array([1, 41, 42, numSamplings, numSamplings, 1003, numSamplings])
+    for orbital_index in (0, numOrbitals - 1):
+        occluded_arrays = np.repeat(dos_array[np.newaxis], len(lo), axis=0)
+        for i in range(len(lo)):
+            occluded_arrays[i, lo[i]:hi[i], orbital_index] = 0.0
+
+        error = np.abs(engine.predict_occlusions(orbital_index, lo, hi) - cnn_predictor.predict_batch(occluded_arrays, adsorbate_dos_array))
+        print(f"orbital {orbital_index}: max abs error {error.max():.2e}")
+        assert np.allclose(error, 0.0, atol=1e-5), "Incremental predictions differ from full model inference."
+
+    # Occluding zero DOS should give zero prediction change
+    zero_lo, zero_hi = np.array([2010, 2050]), np.array([2050, 2100])
+    assert np.all(engine.predict_occlusions(0, zero_lo, zero_hi) - engine.reference_prediction == 0), "Occluding zero DOS should not change the prediction."
+    print(f"reference prediction {engine.reference_prediction:.6f} (model {cnn_predictor.predict(dos_array, adsorbate_dos_array)[0]:.6f})")
+    print("Self-check passed.")